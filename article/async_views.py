@@ -0,0 +1,173 @@
+# async_views.py
+"""
+Vues asynchrones des lectures les plus sollicitées.
+
+Servies par un serveur ASGI (``uvicorn config.asgi:application``), elles
+libèrent la boucle d'événements pendant les requêtes SQL : un même worker
+sert alors de nombreux clients lents. Les requêtes indépendantes d'une
+même vue sont lancées ensemble avec ``asyncio.gather`` (ORM asynchrone et
+threads du pool, chacun sur sa connexion), de sorte que la latence suit la
+plus lente d'entre elles plutôt que leur somme.
+
+DRF ne gérant pas les vues asynchrones, l'authentification JWT et le rendu
+JSON sont faits ici directement.
+"""
+import asyncio
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from rest_framework.exceptions import APIException
+from rest_framework.utils.encoders import JSONEncoder
+
+from config.dbpool import run_in_pool
+from users.authentication import RoleClaimJWTAuthentication
+
+from . import conditional, dashboard
+from .models import Article, ArticleSupplier
+from .serializers import ArticleSerializer, ArticleSupplierSerializer
+
+
+User = get_user_model()
+
+_authentication = RoleClaimJWTAuthentication()
+
+
+def json_response(data, status=200):
+    return JsonResponse(
+        data,
+        status=status,
+        encoder=JSONEncoder,
+        safe=False,
+        json_dumps_params={"ensure_ascii": False},
+    )
+
+
+def _authenticate(request):
+    result = _authentication.authenticate(request)
+    return result[0] if result else None
+
+
+def async_api_view(view):
+    """
+    Équivalent asynchrone de ``@api_view(["GET"])`` +
+    ``@permission_classes([IsAuthenticated])``.
+    """
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return json_response(
+                {"detail": f'Method "{request.method}" not allowed.'}, status=405
+            )
+        try:
+            user = await sync_to_async(_authenticate)(request)
+        except APIException as exc:
+            data = exc.detail
+            if not isinstance(data, (list, dict)):
+                data = {"detail": data}
+            return json_response(data, status=exc.status_code)
+        if user is None or not user.is_active:
+            response = json_response(
+                {"detail": "Authentication credentials were not provided."}, status=401
+            )
+            response.headers["WWW-Authenticate"] = _authentication.authenticate_header(
+                request
+            )
+            return response
+        request.user = user
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def in_thread(func):
+    """
+    Coroutine exécutant une fonction synchrone (sans argument) dans un thread
+    du pool (voir config.dbpool), avec sa propre connexion : plusieurs
+    ``in_thread`` passés à ``asyncio.gather`` s'exécutent réellement en
+    parallèle, contrairement aux méthodes ``a*`` de l'ORM, qui partagent un
+    même thread.
+    """
+    return run_in_pool(func)
+
+
+def _serialize(serializer_class, queryset, request=None):
+    return serializer_class(queryset, many=True, context={"request": request}).data
+
+
+@async_api_view
+async def dashboard_stats(request):
+    """
+    Statistiques pour le tableau de bord
+    GET /api/dashboard/stats/
+
+    Les valeurs proviennent des compteurs matérialisés (voir article.dashboard),
+    reconstruits au besoin par `python manage.py rebuild_dashboard_stats`.
+    """
+    counters, top_articles = await asyncio.gather(
+        in_thread(dashboard.read_counters), in_thread(dashboard.read_top_articles)
+    )
+    return json_response(dashboard.format_stats(counters, top_articles))
+
+
+@async_api_view
+async def list_articles(request):
+    """
+    Liste complète des articles, avec ETag / Last-Modified
+    GET /api/article/
+    """
+    last_modified, version = conditional.combine_article_version(
+        *await asyncio.gather(*map(in_thread, conditional.ARTICLE_VERSION_READS))
+    )
+    etag = conditional.make_etag(request, version)
+    response = conditional.not_modified(request, etag, last_modified)
+    if response is None:
+        data = await sync_to_async(_serialize)(
+            ArticleSerializer, Article.objects.select_related("category"), request
+        )
+        response = json_response(data)
+    return conditional.set_validators(response, etag, last_modified)
+
+
+@async_api_view
+async def article_suppliers_by_article(request, article_id):
+    """
+    Liste des fournisseurs pour un article donné
+    GET /api/articles/{article_id}/suppliers/
+    """
+    exists, data = await asyncio.gather(
+        Article.objects.filter(pk=article_id).aexists(),
+        in_thread(
+            partial(
+                _serialize,
+                ArticleSupplierSerializer,
+                ArticleSupplier.objects.filter(article_id=article_id),
+            )
+        ),
+    )
+    if not exists:
+        return json_response({"detail": "Not found."}, status=404)
+    return json_response(data)
+
+
+@async_api_view
+async def supplier_articles(request, supplier_id):
+    """
+    Liste des articles pour un fournisseur donné
+    GET /api/suppliers/{supplier_id}/articles/
+    """
+    exists, data = await asyncio.gather(
+        User.objects.filter(pk=supplier_id).aexists(),
+        in_thread(
+            partial(
+                _serialize,
+                ArticleSupplierSerializer,
+                ArticleSupplier.objects.filter(supplier_id=supplier_id),
+            )
+        ),
+    )
+    if not exists:
+        return json_response({"detail": "Not found."}, status=404)
+    return json_response(data)
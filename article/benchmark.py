@@ -0,0 +1,469 @@
+# benchmark.py
+"""
+Jeu de données de charge et mesure de latence des routes de l'API.
+
+``seed`` remplit la base avec ``bulk_create`` par lots (les signaux ne sont
+pas déclenchés : compteurs du tableau de bord et index de recherche sont
+reconstruits à la fin). ``run`` appelle chaque route GET avec le client de
+test de Django et mesure latence (p50/p95/p99), nombre de requêtes SQL et
+pic mémoire Python ; ``compare`` signale les régressions par rapport à une
+mesure de référence enregistrée en JSON.
+
+À exécuter sur une base dédiée : les données générées ne sont pas effacées.
+"""
+import math
+import platform
+import random
+import resource
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from config.querycount import track_queries
+from config.testing import ROUTE_URLCONFS, iter_named_routes
+from users.utils import add_role_claims
+
+from . import dashboard, search
+from .models import (
+    Article,
+    ArticleSupplier,
+    Category,
+    Order,
+    OrderItem,
+    RestockRequest,
+    StockAlert,
+    StockLevel,
+    StockMovement,
+    Warehouse,
+)
+
+
+User = get_user_model()
+
+SUPPLIER_GROUP = "fournisseur"
+BENCH_PREFIX = "bench"
+BENCH_ADMIN = f"{BENCH_PREFIX}-admin"
+
+DEFAULT_SIZES = {
+    "categories": 50,
+    "suppliers": 500,
+    "articles": 100_000,
+    "movements": 5_000_000,
+    "orders": 200_000,
+}
+ITEMS_PER_ORDER = 3
+SUPPLIERS_PER_ARTICLE = 2
+HISTORY_DAYS = 365
+
+WORDS = [
+    "vis", "écrou", "boulon", "rondelle", "câble", "gaine", "tube", "joint",
+    "filtre", "courroie", "roulement", "ressort", "clapet", "raccord", "fusible",
+    "relais", "capteur", "moteur", "pompe", "vanne", "acier", "inox", "laiton",
+    "cuivre", "nylon", "renforcé", "standard", "compact", "industriel", "haute",
+]
+ORDER_STATUSES = [status for status, _ in Order.STATUS_CHOICES]
+
+# Routes de détail : modèle dont le premier objet sert de paramètre d'URL
+ROUTE_OBJECTS = {
+    "category-detail": Category,
+    "article-detail": Article,
+    "article-suppliers": Article,
+    "stock-movement-detail": StockMovement,
+    "stock-alert-detail": StockAlert,
+    "restockrequest-detail": RestockRequest,
+    "order-detail": Order,
+    "orderitem-detail": OrderItem,
+    "articlesupplier-detail": ArticleSupplier,
+    "warehouse-detail": Warehouse,
+    "stock-level-detail": StockLevel,
+}
+
+DEFAULT_ITERATIONS = 20
+DEFAULT_WARMUP = 2
+DEFAULT_THRESHOLD = 0.20
+# En dessous de cet écart absolu, une hausse de latence n'est que du bruit
+MIN_REGRESSION_MS = 2.0
+
+
+def _batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert(model, rows, batch_size, log):
+    """
+    Insère ``rows`` (un générateur) lot par lot, chaque lot dans sa propre
+    transaction, pour garder une mémoire constante.
+    """
+    count = 0
+    for batch in _batches(rows, batch_size):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=batch_size)
+        count += len(batch)
+        log(f"{model._meta.model_name}: {count}")
+    return count
+
+
+def _new_ids(model, after_id):
+    # MySQL ne renvoie pas les clés des bulk_create : on les relit
+    return list(
+        model.objects.filter(pk__gt=after_id).order_by("pk").values_list("pk", flat=True)
+    )
+
+
+def _last_id(model):
+    return model.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+
+
+def seed(sizes=None, batch_size=5000, seed_value=0, log=print, reindex=True):
+    """
+    Génère un jeu de données de la taille demandée (voir ``DEFAULT_SIZES``).
+    Retourne le nombre de lignes créées par table.
+    """
+    sizes = {**DEFAULT_SIZES, **(sizes or {})}
+    rng = random.Random(seed_value)
+    now = timezone.now()
+    run = f"{seed_value}-{int(time.time())}"
+    created = {}
+
+    def past(days=HISTORY_DAYS):
+        return now - timedelta(seconds=rng.randrange(days * 86400))
+
+    last = _last_id(Category)
+    created["categories"] = _insert(
+        Category,
+        (
+            Category(name=f"{BENCH_PREFIX}-{run}-cat-{i}", description="")
+            for i in range(sizes["categories"])
+        ),
+        batch_size,
+        log,
+    )
+    category_ids = _new_ids(Category, last)
+
+    supplier_group, _ = Group.objects.get_or_create(name=SUPPLIER_GROUP)
+    last = _last_id(User)
+    created["suppliers"] = _insert(
+        User,
+        (
+            User(username=f"{BENCH_PREFIX}-{run}-sup-{i}", password="!")
+            for i in range(sizes["suppliers"])
+        ),
+        batch_size,
+        log,
+    )
+    supplier_ids = _new_ids(User, last)
+    Membership = User.groups.through
+    _insert(
+        Membership,
+        (Membership(user_id=pk, group_id=supplier_group.pk) for pk in supplier_ids),
+        batch_size,
+        log,
+    )
+
+    last = _last_id(Article)
+    created["articles"] = _insert(
+        Article,
+        (
+            Article(
+                name=" ".join(rng.sample(WORDS, 3)) + f" {i}",
+                category_id=rng.choice(category_ids) if category_ids else None,
+                unit_price=Decimal(rng.randrange(100, 100_000)) / 100,
+                quantity=rng.randrange(0, 500),
+                critical_threshold=rng.randrange(0, 50),
+                created_at=past(),
+            )
+            for i in range(sizes["articles"])
+        ),
+        batch_size,
+        log,
+    )
+    article_ids = _new_ids(Article, last)
+    if not article_ids:
+        return created
+    # Le stock initial est dans l'entrepôt par défaut (Article.quantity = somme des niveaux)
+    default_warehouse_id = Warehouse.objects.default_id()
+    _insert(
+        StockLevel,
+        (
+            StockLevel(article_id=pk, warehouse_id=default_warehouse_id, quantity=quantity)
+            for pk, quantity in Article.objects.filter(pk__gt=last, quantity__gt=0)
+            .order_by("pk")
+            .values_list("pk", "quantity")
+            .iterator()
+        ),
+        batch_size,
+        log,
+    )
+
+    if supplier_ids:
+        created["article_suppliers"] = _insert(
+            ArticleSupplier,
+            (
+                ArticleSupplier(
+                    article_id=article_id,
+                    supplier_id=supplier_id,
+                    supplier_reference=f"REF-{article_id}-{n}",
+                    supplier_price=Decimal(rng.randrange(100, 100_000)) / 100,
+                    is_preferred=n == 0,
+                )
+                for article_id in article_ids
+                for n, supplier_id in enumerate(
+                    rng.sample(supplier_ids, min(SUPPLIERS_PER_ARTICLE, len(supplier_ids)))
+                )
+            ),
+            batch_size,
+            log,
+        )
+
+    # Historique seul (les quantités ne sont pas rejouées) : pas de transferts,
+    # qui exigeraient deux entrepôts
+    movement_types = [
+        movement_type
+        for movement_type, _ in StockMovement.MOVEMENT_TYPES
+        if movement_type != "transfer"
+    ]
+
+    def movements():
+        for i in range(sizes["movements"]):
+            movement = StockMovement(
+                article_id=rng.choice(article_ids),
+                movement_type=rng.choice(movement_types),
+                quantity=rng.randrange(1, 100),
+                reference_document=f"BENCH-{i}",
+                created_at=past(),
+            )
+            movement.resolve_warehouses(default_warehouse_id)
+            yield movement
+
+    created["movements"] = _insert(StockMovement, movements(), batch_size, log)
+
+    if supplier_ids:
+        last = _last_id(Order)
+        created["orders"] = _insert(
+            Order,
+            (
+                Order(
+                    order_number=f"{BENCH_PREFIX}-{run}-{i}",
+                    supplier_id=rng.choice(supplier_ids),
+                    status=rng.choice(ORDER_STATUSES),
+                    order_date=past(),
+                )
+                for i in range(sizes["orders"])
+            ),
+            batch_size,
+            log,
+        )
+        order_ids = _new_ids(Order, last)
+
+        def order_items():
+            per_order = min(ITEMS_PER_ORDER, len(article_ids))
+            for order_id in order_ids:
+                for article_id in rng.sample(article_ids, per_order):
+                    ordered = rng.randrange(1, 200)
+                    yield OrderItem(
+                        order_id=order_id,
+                        article_id=article_id,
+                        quantity_ordered=ordered,
+                        quantity_received=rng.randrange(0, ordered + 1),
+                        unit_price=Decimal(rng.randrange(100, 100_000)) / 100,
+                        created_at=past(),
+                    )
+
+        created["order_items"] = _insert(OrderItem, order_items(), batch_size, log)
+
+    if reindex:
+        log("Reconstruction des compteurs du tableau de bord…")
+        dashboard.rebuild()
+        log("Reconstruction de l'index de recherche…")
+        search.rebuild()
+    return created
+
+
+def percentile(sorted_values, p):
+    """Percentile par rang le plus proche d'une liste déjà triée"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def benchmark_client():
+    """
+    Client de test authentifié par un vrai jeton JWT d'administrateur, pour
+    couvrir aussi les vues asynchrones.
+    """
+    user, created = User.objects.get_or_create(
+        username=BENCH_ADMIN, defaults={"is_superuser": True, "is_staff": True}
+    )
+    if created:
+        user.set_unusable_password()
+        user.save(update_fields=["password"])
+    admin_group, _ = Group.objects.get_or_create(name="admin")
+    user.groups.add(admin_group)
+    token = add_role_claims(RefreshToken.for_user(user), user).access_token
+    return Client(headers={"Authorization": f"Bearer {token}"})
+
+
+def route_kwargs(name, params):
+    """Paramètres d'URL pointant vers des objets existants"""
+    if not params:
+        return {}
+    if name == "supplier-articles":
+        pk = (
+            User.objects.filter(groups__name=SUPPLIER_GROUP)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+            .first()
+        )
+    elif name in ROUTE_OBJECTS:
+        pk = ROUTE_OBJECTS[name].objects.order_by("pk").values_list("pk", flat=True).first()
+    else:
+        pk = None
+    return {param: pk or 1 for param in params}
+
+
+def iter_routes(names=None):
+    for urlconf in ROUTE_URLCONFS:
+        for name, params in iter_named_routes(urlconf):
+            if names and name not in names:
+                continue
+            yield name, reverse(name, kwargs=route_kwargs(name, params))
+
+
+def _request(client, path):
+    response = client.get(path)
+    # Le temps d'une réponse en flux inclut sa génération
+    if getattr(response, "streaming", False):
+        b"".join(response.streaming_content)
+    return response
+
+
+def measure(client, path, iterations=DEFAULT_ITERATIONS, warmup=DEFAULT_WARMUP):
+    """
+    Mesure une route. Retourne ``None`` si elle n'accepte pas GET.
+
+    Une première requête, non chronométrée, écarte les routes sans GET ;
+    elle compte dans l'échauffement (faite même si ``warmup`` vaut 0).
+    """
+    response = _request(client, path)
+    if response.status_code == 405:
+        return None
+    for _ in range(warmup - 1):
+        _request(client, path)
+
+    timings = []
+    queries = []
+    for _ in range(iterations):
+        with track_queries() as stats:
+            start = time.perf_counter()
+            response = _request(client, path)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(stats.count)
+
+    # Passe séparée : tracemalloc fausserait les latences
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        _request(client, path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "path": path,
+        "status": response.status_code,
+        "iterations": iterations,
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "p99_ms": round(percentile(timings, 99), 2),
+        "mean_ms": round(sum(timings) / len(timings), 2),
+        "queries": max(queries),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def dataset_sizes():
+    return {
+        "categories": Category.objects.count(),
+        "articles": Article.objects.count(),
+        "movements": StockMovement.objects.count(),
+        "orders": Order.objects.count(),
+        "order_items": OrderItem.objects.count(),
+        "suppliers": User.objects.filter(groups__name=SUPPLIER_GROUP).count(),
+    }
+
+
+def run(names=None, iterations=DEFAULT_ITERATIONS, warmup=DEFAULT_WARMUP, log=print):
+    """
+    Mesure toutes les routes GET nommées (ou seulement ``names``).
+    """
+    client = benchmark_client()
+    routes = {}
+    for name, path in iter_routes(names):
+        result = measure(client, path, iterations=iterations, warmup=warmup)
+        if result is None:
+            continue
+        routes[name] = result
+        log(
+            f"{name:35} {result['status']} p50={result['p50_ms']}ms "
+            f"p95={result['p95_ms']}ms p99={result['p99_ms']}ms "
+            f"queries={result['queries']} mem={result['peak_memory_kb']}kB"
+        )
+    return {
+        "created_at": timezone.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            # ru_maxrss est en ko sous Linux
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+        "dataset": dataset_sizes(),
+        "routes": routes,
+    }
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, min_delta_ms=MIN_REGRESSION_MS):
+    """
+    Régressions de ``current`` par rapport à ``baseline`` : hausse du p95
+    au-delà de ``threshold`` (relatif) et de ``min_delta_ms`` (absolu), plus
+    de requêtes SQL, ou changement de code de statut.
+    """
+    regressions = []
+    for name, before in baseline["routes"].items():
+        after = current["routes"].get(name)
+        if after is None:
+            continue
+        if after["status"] != before["status"]:
+            regressions.append(f"{name}: statut {before['status']} -> {after['status']}")
+        delta = after["p95_ms"] - before["p95_ms"]
+        if delta > min_delta_ms and delta > before["p95_ms"] * threshold:
+            regressions.append(
+                f"{name}: p95 {before['p95_ms']}ms -> {after['p95_ms']}ms "
+                f"(+{delta / before['p95_ms']:.0%})"
+                if before["p95_ms"]
+                else f"{name}: p95 0ms -> {after['p95_ms']}ms"
+            )
+        if after["queries"] > before["queries"]:
+            regressions.append(
+                f"{name}: requêtes SQL {before['queries']} -> {after['queries']}"
+            )
+    return regressions
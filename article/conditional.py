@@ -0,0 +1,143 @@
+# conditional.py
+"""
+Requêtes GET conditionnelles (ETag / Last-Modified) sur le catalogue.
+
+La version d'une collection est lue sans charger ses lignes : date de
+modification la plus récente (colonnes ``updated_at`` indexées) et nombre
+de lignes tiré des compteurs matérialisés du tableau de bord, afin qu'une
+suppression change aussi l'ETag. Une requête dont l'ETag correspond reçoit
+un 304 sans que le serializer ne soit exécuté.
+"""
+import hashlib
+from functools import partial
+
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from . import dashboard
+from .models import Article, Category, DashboardCounter
+
+
+def last_updated(model):
+    return model.objects.aggregate(last=Max("updated_at"))["last"]
+
+
+def counter(key):
+    return (
+        DashboardCounter.objects.filter(key=key).values_list("value", flat=True).first()
+    )
+
+
+def category_collection_version():
+    last = last_updated(Category)
+    return last, (last, counter(dashboard.CATEGORIES))
+
+
+# Lectures indépendantes qui composent la version de la collection d'articles
+# (exécutées en parallèle par la vue asynchrone)
+ARTICLE_VERSION_READS = [
+    partial(last_updated, Article),
+    partial(counter, dashboard.ARTICLES),
+    partial(last_updated, Category),
+    partial(counter, dashboard.CATEGORIES),
+]
+
+
+def combine_article_version(last, count, category_last, category_count):
+    """
+    Les articles embarquent leur catégorie : sa version en fait partie.
+    """
+    return (
+        max(filter(None, [last, category_last]), default=None),
+        (last, count, (category_last, category_count)),
+    )
+
+
+def article_collection_version():
+    return combine_article_version(*(read() for read in ARTICLE_VERSION_READS))
+
+
+def category_object_version(pk):
+    last = Category.objects.filter(pk=pk).values_list("updated_at", flat=True).first()
+    return last, last
+
+
+def article_object_version(pk):
+    row = (
+        Article.objects.filter(pk=pk)
+        .values_list("updated_at", "category__updated_at")
+        .first()
+    )
+    if row is None:
+        return None, None
+    return max(filter(None, row)), row
+
+
+def make_etag(request, *parts):
+    """
+    ETag faible dérivé de l'URL complète (filtres, page) et de la version.
+    """
+    source = "|".join([request.build_absolute_uri(), *map(str, parts)])
+    return f'W/"{hashlib.sha1(source.encode()).hexdigest()}"'
+
+
+def _timestamp(last_modified):
+    return int(last_modified.timestamp()) if last_modified else None
+
+
+def not_modified(request, etag, last_modified):
+    """
+    Réponse 304 (ou 412) si le client possède déjà cette version, sinon None.
+    """
+    return get_conditional_response(
+        request, etag=etag, last_modified=_timestamp(last_modified)
+    )
+
+
+def set_validators(response, etag, last_modified):
+    if response.status_code in (200, 304):
+        response.headers["ETag"] = etag
+        if last_modified:
+            response.headers["Last-Modified"] = http_date(_timestamp(last_modified))
+    return response
+
+
+def conditional(request, etag, last_modified, render):
+    """
+    Retourne un 304 si le client possède déjà cette version, sinon la
+    réponse produite par ``render()``, complétée des en-têtes de validation.
+    """
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        response = render()
+    return set_validators(response, etag, last_modified)
+
+
+class ConditionalGetMixin:
+    """
+    Ajoute ETag et Last-Modified aux routes list et retrieve d'un ViewSet.
+
+    Les sous-classes fournissent ``get_collection_version()`` et
+    ``get_object_version(pk)``, qui retournent ``(last_modified, version)``.
+    """
+
+    def list(self, request, *args, **kwargs):
+        last_modified, version = self.get_collection_version()
+        return conditional(
+            request,
+            make_etag(request, version),
+            last_modified,
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        last_modified, version = self.get_object_version(
+            kwargs[self.lookup_url_kwarg or self.lookup_field]
+        )
+        return conditional(
+            request,
+            make_etag(request, version),
+            last_modified,
+            lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs),
+        )
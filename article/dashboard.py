@@ -0,0 +1,201 @@
+# dashboard.py
+"""
+Compteurs matérialisés du tableau de bord.
+
+Les compteurs sont mis à jour de façon incrémentale par les signaux de
+``article.signals`` et par les chemins d'écriture en masse, afin que la
+lecture des statistiques ne dépende pas de la taille des tables.
+"""
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When
+
+from .models import Article, Category, DashboardCounter, Order, OrderItem
+
+
+User = get_user_model()
+
+ARTICLES = "articles"
+CRITICAL_ARTICLES = "critical_articles"
+CATEGORIES = "categories"
+ORDERS = "orders"
+SUPPLIERS = "suppliers"
+ORDER_STATUS_PREFIX = "orders_status:"
+ARTICLE_ORDERS_PREFIX = "article_orders:"
+
+SCALAR_KEYS = [ARTICLES, CRITICAL_ARTICLES, CATEGORIES, ORDERS, SUPPLIERS]
+
+SUPPLIER_GROUP = "fournisseur"
+PENDING_STATUS = "pending"
+
+
+def order_status_key(order_status):
+    return f"{ORDER_STATUS_PREFIX}{order_status}"
+
+
+def article_orders_key(article_id):
+    return f"{ARTICLE_ORDERS_PREFIX}{article_id}"
+
+
+def bump(key, delta=1):
+    """
+    Incrémente (ou décrémente) un compteur par une requête UPDATE atomique.
+    """
+    if not delta:
+        return
+    counters = DashboardCounter.objects.filter(key=key)
+    if counters.update(value=F("value") + delta):
+        return
+    _, created = DashboardCounter.objects.get_or_create(
+        key=key, defaults={"value": delta}
+    )
+    if not created:
+        counters.update(value=F("value") + delta)
+
+
+def bump_many(deltas):
+    """
+    Applique ``{clé: variation}`` en deux requêtes quel que soit le nombre de
+    clés : création des compteurs manquants (``ignore_conflicts``), puis un
+    seul UPDATE avec ``CASE key WHEN ...``.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    DashboardCounter.objects.bulk_create(
+        [DashboardCounter(key=key, value=0) for key in deltas],
+        ignore_conflicts=True,
+    )
+    DashboardCounter.objects.filter(key__in=list(deltas)).update(
+        value=F("value")
+        + Case(
+            *[When(key=key, then=Value(delta)) for key, delta in deltas.items()],
+            default=Value(0),
+        )
+    )
+
+
+def count_order_items(article_ids):
+    """
+    Répercute sur les compteurs des lignes de commande écrites en masse
+    (``bulk_create`` n'émet pas de signaux).
+    """
+    bump_many(
+        {
+            article_orders_key(article_id): count
+            for article_id, count in Counter(article_ids).items()
+        }
+    )
+
+
+def read_counters():
+    """
+    Compteurs globaux et compteurs par statut de commande.
+    """
+    return dict(
+        DashboardCounter.objects.filter(
+            Q(key__in=SCALAR_KEYS) | Q(key__startswith=ORDER_STATUS_PREFIX)
+        ).values_list("key", "value")
+    )
+
+
+def read_top_articles():
+    """
+    Les cinq articles les plus commandés : ``[(id, nom, nombre)]``.
+    """
+    top = list(
+        DashboardCounter.objects.filter(
+            key__startswith=ARTICLE_ORDERS_PREFIX, value__gt=0
+        )
+        .order_by("-value")
+        .values_list("key", "value")[:5]
+    )
+    top_ids = [int(key[len(ARTICLE_ORDERS_PREFIX):]) for key, _ in top]
+    names = dict(Article.objects.filter(pk__in=top_ids).values_list("id", "name"))
+    return [
+        (article_id, names.get(article_id), value)
+        for article_id, (_, value) in zip(top_ids, top)
+    ]
+
+
+def format_stats(counters, top_articles):
+    return {
+        "total_articles": counters.get(ARTICLES, 0),
+        "critical_articles": counters.get(CRITICAL_ARTICLES, 0),
+        "total_categories": counters.get(CATEGORIES, 0),
+        "pending_orders": counters.get(order_status_key(PENDING_STATUS), 0),
+        "total_orders": counters.get(ORDERS, 0),
+        "total_suppliers": counters.get(SUPPLIERS, 0),
+        "orders_by_status": [
+            {"status": key[len(ORDER_STATUS_PREFIX):], "count": value}
+            for key, value in sorted(counters.items())
+            if key.startswith(ORDER_STATUS_PREFIX) and value
+        ],
+        "top_articles": [
+            {"id": article_id, "name": name, "order_count": value}
+            for article_id, name, value in top_articles
+        ],
+    }
+
+
+def read_stats():
+    """
+    Statistiques du tableau de bord lues depuis les compteurs matérialisés.
+
+    Le coût est constant : une requête pour les compteurs globaux, une pour
+    les cinq articles les plus commandés et une pour leurs noms. Les deux
+    premières sont indépendantes (voir la vue asynchrone, qui les parallélise).
+    """
+    return format_stats(read_counters(), read_top_articles())
+
+
+def live_counters():
+    """
+    Recalcule tous les compteurs à partir des agrégats réels.
+    """
+    counters = {
+        ARTICLES: Article.objects.count(),
+        CRITICAL_ARTICLES: Article.objects.filter(is_critical=True).count(),
+        CATEGORIES: Category.objects.count(),
+        ORDERS: Order.objects.count(),
+        SUPPLIERS: User.objects.filter(groups__name=SUPPLIER_GROUP).count(),
+    }
+    for row in Order.objects.order_by().values("status").annotate(count=Count("id")):
+        counters[order_status_key(row["status"])] = row["count"]
+    for row in (
+        OrderItem.objects.order_by().values("article").annotate(count=Count("id"))
+    ):
+        counters[article_orders_key(row["article"])] = row["count"]
+    return counters
+
+
+def rebuild():
+    """
+    Reconstruit entièrement le magasin de compteurs.
+    """
+    counters = live_counters()
+    with transaction.atomic():
+        DashboardCounter.objects.all().delete()
+        DashboardCounter.objects.bulk_create(
+            [DashboardCounter(key=key, value=value) for key, value in counters.items()],
+            batch_size=1000,
+        )
+    return counters
+
+
+def check():
+    """
+    Compare les compteurs stockés aux agrégats réels.
+
+    Retourne la liste des écarts sous la forme ``(clé, stocké, réel)``.
+    """
+    live = live_counters()
+    stored = dict(DashboardCounter.objects.values_list("key", "value"))
+    mismatches = []
+    for key in sorted(set(live) | set(stored)):
+        expected, actual = live.get(key, 0), stored.get(key, 0)
+        if expected != actual:
+            mismatches.append((key, actual, expected))
+    return mismatches
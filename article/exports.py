@@ -0,0 +1,71 @@
+# exports.py
+"""
+Exports en flux (CSV ou NDJSON) des grandes tables.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from config.dbrouter import bind_read_database
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class _Echo:
+    """Pseudo-fichier dont write() renvoie la ligne au lieu de la stocker."""
+
+    def write(self, value):
+        return value
+
+
+def iter_rows(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Parcourt un queryset par tranches sur la clé primaire.
+
+    Chaque tranche est une requête ``pk > dernier_pk LIMIT n`` : la mémoire
+    reste constante, y compris sur MySQL où le pilote charge le résultat
+    complet d'une requête en mémoire.
+    """
+    queryset = queryset.order_by("pk").values_list("pk", *fields)
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(chunk[:chunk_size])
+        if not rows:
+            return
+        for row in rows:
+            yield row[1:]
+        last_pk = rows[-1][0]
+
+
+def _csv_lines(rows, fields):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _ndjson_lines(rows, fields):
+    for row in rows:
+        yield json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def stream_export(queryset, fields, output, filename):
+    """
+    Réponse HTTP diffusant ``fields`` pour chaque ligne de ``queryset``.
+    """
+    # Le flux est lu après la vue, hors du routage de la requête : la base
+    # (réplica ou principale) est choisie maintenant
+    rows = iter_rows(bind_read_database(queryset), fields)
+    lines = _ndjson_lines(rows, fields) if output == "ndjson" else _csv_lines(rows, fields)
+    response = StreamingHttpResponse(lines, content_type=EXPORT_FORMATS[output])
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{output}"'
+    return response
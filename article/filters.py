@@ -0,0 +1,76 @@
+# filters.py
+import django_filters
+
+from django.db.models import Q
+
+from .models import Article, Order, OrderItem, StockAlert, StockLevel, StockMovement
+
+
+class ArticleFilter(django_filters.FilterSet):
+    created_after = django_filters.DateTimeFilter(field_name="created_at", lookup_expr="gte")
+    created_before = django_filters.DateTimeFilter(field_name="created_at", lookup_expr="lte")
+    supplier = django_filters.NumberFilter(field_name="articlesupplier__supplier")
+    critical = django_filters.BooleanFilter(field_name="is_critical")
+
+    class Meta:
+        model = Article
+        fields = ["category"]
+
+
+class StockMovementFilter(django_filters.FilterSet):
+    date_from = django_filters.DateTimeFilter(field_name="created_at", lookup_expr="gte")
+    date_to = django_filters.DateTimeFilter(field_name="created_at", lookup_expr="lte")
+    category = django_filters.NumberFilter(field_name="article__category")
+    type = django_filters.ChoiceFilter(
+        field_name="movement_type", choices=StockMovement.MOVEMENT_TYPES
+    )
+    # Mouvements entrant dans l'entrepôt ou en sortant
+    warehouse = django_filters.NumberFilter(method="filter_warehouse")
+
+    class Meta:
+        model = StockMovement
+        fields = ["article", "movement_type", "user", "source_warehouse", "destination_warehouse"]
+
+    def filter_warehouse(self, queryset, name, value):
+        return queryset.filter(
+            Q(source_warehouse=value) | Q(destination_warehouse=value)
+        )
+
+
+class OrderFilter(django_filters.FilterSet):
+    date_from = django_filters.DateTimeFilter(field_name="order_date", lookup_expr="gte")
+    date_to = django_filters.DateTimeFilter(field_name="order_date", lookup_expr="lte")
+
+    class Meta:
+        model = Order
+        fields = ["status", "supplier"]
+
+
+class OrderItemFilter(django_filters.FilterSet):
+    # Filtres sur les annotations SQL de OrderItem.objects
+    total_price__gte = django_filters.NumberFilter(field_name="total_price", lookup_expr="gte")
+    total_price__lte = django_filters.NumberFilter(field_name="total_price", lookup_expr="lte")
+    remaining_quantity__gte = django_filters.NumberFilter(field_name="remaining_quantity", lookup_expr="gte")
+
+    class Meta:
+        model = OrderItem
+        fields = ["order", "article"]
+
+
+class StockAlertFilter(django_filters.FilterSet):
+    pending = django_filters.BooleanFilter(field_name="dispatched_at", lookup_expr="isnull")
+
+    class Meta:
+        model = StockAlert
+        fields = ["article", "kind"]
+
+
+class StockLevelFilter(django_filters.FilterSet):
+    in_stock = django_filters.BooleanFilter(method="filter_in_stock")
+
+    class Meta:
+        model = StockLevel
+        fields = ["article", "warehouse"]
+
+    def filter_in_stock(self, queryset, name, value):
+        return queryset.filter(quantity__gt=0) if value else queryset.filter(quantity=0)
@@ -0,0 +1,65 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment
+
+from article import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure la latence (p50/p95/p99), le nombre de requêtes SQL et le pic "
+        "mémoire de chaque route GET, et compare à une mesure de référence."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output", default="benchmark.json", help="Fichier JSON des résultats."
+        )
+        parser.add_argument(
+            "--compare",
+            metavar="BASELINE",
+            help="Fichier JSON de référence ; échoue en cas de régression.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=benchmark.DEFAULT_THRESHOLD,
+            help="Hausse relative du p95 tolérée (0.2 = 20 %%).",
+        )
+        parser.add_argument("--iterations", type=int, default=benchmark.DEFAULT_ITERATIONS)
+        parser.add_argument("--warmup", type=int, default=benchmark.DEFAULT_WARMUP)
+        parser.add_argument(
+            "--route", action="append", dest="routes", help="Nom de route (répétable)."
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations doit être au moins 1.")
+        if options["warmup"] < 0:
+            raise CommandError("--warmup ne peut pas être négatif.")
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as f:
+                baseline = json.load(f)
+
+        # Autorise l'hôte « testserver » du client de test, sans mode DEBUG
+        setup_test_environment(debug=False)
+        results = benchmark.run(
+            names=options["routes"],
+            iterations=options["iterations"],
+            warmup=options["warmup"],
+            log=self.stdout.write,
+        )
+        with open(options["output"], "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        self.stdout.write(f"Résultats enregistrés dans {options['output']}.")
+
+        if baseline is None:
+            return
+        regressions = benchmark.compare(baseline, results, threshold=options["threshold"])
+        for regression in regressions:
+            self.stdout.write(self.style.WARNING(regression))
+        if regressions:
+            raise CommandError(f"{len(regressions)} régression(s) détectée(s).")
+        self.stdout.write(self.style.SUCCESS("Aucune régression."))
@@ -0,0 +1,42 @@
+import csv
+
+from django.core.management.base import BaseCommand
+
+from article import reorder
+from config.dbrouter import read_from_replica
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcule en un lot les points de commande et quantités suggérées de "
+        "tous les articles, et les écrit au format CSV."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--window-days", type=int, default=reorder.WINDOW_DAYS)
+        parser.add_argument("--safety-days", type=int, default=reorder.SAFETY_DAYS)
+        parser.add_argument("--review-days", type=int, default=reorder.REVIEW_DAYS)
+        parser.add_argument(
+            "--default-lead-time-days", type=int, default=reorder.DEFAULT_LEAD_TIME_DAYS
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Inclut les articles qui n'ont pas besoin d'être réapprovisionnés.",
+        )
+
+    def handle(self, *args, **options):
+        writer = csv.writer(self.stdout)
+        writer.writerow(reorder.FIELDS)
+        count = 0
+        with read_from_replica():
+            for row in reorder.compute_recommendations(
+                window_days=options["window_days"],
+                safety_days=options["safety_days"],
+                review_days=options["review_days"],
+                default_lead_time_days=options["default_lead_time_days"],
+            ):
+                if options["all"] or row["needs_reorder"]:
+                    writer.writerow([row[field] for field in reorder.FIELDS])
+                    count += 1
+        self.stderr.write(f"{count} article(s) listé(s).")
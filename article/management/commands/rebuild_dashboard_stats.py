@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from article import dashboard
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruit les compteurs matérialisés du tableau de bord à partir des "
+        "agrégats réels, ou vérifie leur cohérence avec --check."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Compare les compteurs aux agrégats réels sans rien modifier.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            mismatches = dashboard.check()
+            for key, stored, live in mismatches:
+                self.stdout.write(f"{key}: stocké={stored} réel={live}")
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} compteur(s) incohérent(s).")
+            self.stdout.write(self.style.SUCCESS("Compteurs cohérents."))
+            return
+
+        counters = dashboard.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(counters)} compteur(s) reconstruit(s).")
+        )
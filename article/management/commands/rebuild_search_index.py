@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from article import search
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche des articles."
+
+    def handle(self, *args, **options):
+        count = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{count} article(s) indexé(s)."))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from article import thumbnails
+from article.models import Article
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère les miniatures manquantes ou périmées des images d'articles "
+        "(toutes avec --force)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Régénère aussi les miniatures déjà à jour.",
+        )
+
+    def handle(self, *args, **options):
+        articles = Article.objects.exclude(image="").exclude(image__isnull=True).only(
+            "id", "image", "image_renditions"
+        )
+        generated = failed = 0
+        for article in articles.iterator(chunk_size=500):
+            if not options["force"] and thumbnails.is_current(article):
+                continue
+            try:
+                thumbnails.generate_renditions(
+                    article.pk,
+                    article.image.name,
+                    thumbnails.stale_rendition_names(article),
+                )
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"Article {article.pk} : {exc}")
+                continue
+            generated += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Miniatures générées pour {generated} article(s), {failed} échec(s)."
+            )
+        )
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from article import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Remplit la base avec un jeu de données de charge (bulk_create par "
+        "lots). À utiliser sur une base dédiée aux mesures."
+    )
+
+    def add_arguments(self, parser):
+        for name, default in benchmark.DEFAULT_SIZES.items():
+            parser.add_argument(f"--{name}", type=int, default=default)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--no-reindex",
+            action="store_true",
+            help="Ne reconstruit pas les compteurs du tableau de bord ni l'index de recherche.",
+        )
+
+    def handle(self, *args, **options):
+        created = benchmark.seed(
+            sizes={name: options[name] for name in benchmark.DEFAULT_SIZES},
+            batch_size=options["batch_size"],
+            seed_value=options["seed"],
+            log=self.stderr.write,
+            reindex=not options["no_reindex"],
+        )
+        for name, count in created.items():
+            self.stdout.write(f"{name}: {count}")
+        self.stdout.write(self.style.SUCCESS("Jeu de données généré."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from article import snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Enregistre un instantané du stock de tous les articles, point de départ "
+        "des requêtes de stock historique (à planifier quotidiennement)."
+    )
+
+    def handle(self, *args, **options):
+        taken_at, count = snapshots.take_snapshot()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{count} instantané(s) enregistré(s) à {taken_at:%Y-%m-%d %H:%M:%S}."
+            )
+        )
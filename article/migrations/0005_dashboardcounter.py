@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-17 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0004_restockrequest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True, verbose_name='Clé')),
+                ('value', models.BigIntegerField(db_index=True, default=0, verbose_name='Valeur')),
+            ],
+            options={
+                'verbose_name': 'Compteur du tableau de bord',
+                'verbose_name_plural': 'Compteurs du tableau de bord',
+            },
+        ),
+    ]
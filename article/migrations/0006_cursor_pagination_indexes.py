@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-17 16:04
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0005_dashboardcounter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name="Date d'ajout"),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['-created_at', 'id'], name='article_ord_created_c5d07d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['-created_at', 'id'], name='article_ord_created_2a358c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['-created_at', 'id'], name='article_sto_created_9bb7b9_idx'),
+        ),
+    ]
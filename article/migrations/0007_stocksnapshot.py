@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-17 17:11
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0006_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(verbose_name='Quantité en stock')),
+                ('taken_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name="Date de l'instantané")),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='article.article', verbose_name='Article')),
+            ],
+            options={
+                'verbose_name': 'Instantané de stock',
+                'verbose_name_plural': 'Instantanés de stock',
+                'ordering': ['-taken_at'],
+                'unique_together': {('taken_at', 'article')},
+            },
+        ),
+    ]
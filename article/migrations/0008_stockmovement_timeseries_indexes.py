@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-17 17:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0007_stocksnapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['article', 'created_at'], name='article_sto_article_04fc13_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['movement_type', 'created_at'], name='article_sto_movemen_661e82_idx'),
+        ),
+    ]
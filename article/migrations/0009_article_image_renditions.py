@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 17:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0008_stockmovement_timeseries_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Image source et chemins des miniatures générées (voir article.thumbnails)', verbose_name="Miniatures de l'image"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-17 17:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0009_article_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Date de modification'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Date de modification'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-17 17:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0010_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64, verbose_name='Mot')),
+                ('weight', models.PositiveSmallIntegerField(default=1, verbose_name='Poids')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='article.article', verbose_name='Article')),
+            ],
+            options={
+                'verbose_name': 'Mot indexé',
+                'verbose_name_plural': 'Mots indexés',
+                'unique_together': {('token', 'article')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-17 17:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0011_articlesearchtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='is_critical',
+            field=models.GeneratedField(db_index=True, db_persist=True, expression=models.Case(models.When(quantity__lte=models.F('critical_threshold'), then=models.Value(True)), default=models.Value(False)), output_field=models.BooleanField(), verbose_name='Stock critique'),
+        ),
+        migrations.CreateModel(
+            name='StockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('low_stock', 'Stock critique'), ('restocked', 'Stock rétabli')], max_length=20, verbose_name='Type')),
+                ('quantity', models.PositiveIntegerField(verbose_name='Quantité en stock')),
+                ('critical_threshold', models.PositiveIntegerField(verbose_name='Seuil critique')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name="Date de l'alerte")),
+                ('dispatched_at', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Date de distribution')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_alerts', to='article.article', verbose_name='Article')),
+            ],
+            options={
+                'verbose_name': 'Alerte de stock',
+                'verbose_name_plural': 'Alertes de stock',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['-created_at', 'id'], name='article_sto_created_7d4fe7_idx')],
+            },
+        ),
+    ]
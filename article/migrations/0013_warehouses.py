@@ -0,0 +1,75 @@
+# Generated by Django 5.2.1 on 2026-10-17 17:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def move_stock_to_default_warehouse(apps, schema_editor):
+    # Le stock existant est placé dans l'entrepôt par défaut
+    Article = apps.get_model("article", "Article")
+    StockLevel = apps.get_model("article", "StockLevel")
+    Warehouse = apps.get_model("article", "Warehouse")
+    warehouse, _ = Warehouse.objects.get_or_create(
+        code="PRINCIPAL", defaults={"name": "Entrepôt principal"}
+    )
+    rows = Article.objects.filter(quantity__gt=0).values_list("id", "quantity").iterator()
+    batch = []
+    for article_id, quantity in rows:
+        batch.append(
+            StockLevel(article_id=article_id, warehouse_id=warehouse.pk, quantity=quantity)
+        )
+        if len(batch) >= 1000:
+            StockLevel.objects.bulk_create(batch)
+            batch = []
+    StockLevel.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0012_critical_flag_and_stock_alerts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Warehouse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=20, unique=True, verbose_name='Code')),
+                ('name', models.CharField(max_length=100, verbose_name="Nom de l'entrepôt")),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Entrepôt',
+                'verbose_name_plural': 'Entrepôts',
+                'ordering': ['code'],
+            },
+        ),
+        migrations.AddField(
+            model_name='stockmovement',
+            name='destination_warehouse',
+            field=models.ForeignKey(blank=True, help_text='Entrées, ajustements et transferts (entrepôt par défaut si vide)', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='incoming_movements', to='article.warehouse', verbose_name='Entrepôt de destination'),
+        ),
+        migrations.AddField(
+            model_name='stockmovement',
+            name='source_warehouse',
+            field=models.ForeignKey(blank=True, help_text='Sorties et transferts (entrepôt par défaut si vide)', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='outgoing_movements', to='article.warehouse', verbose_name='Entrepôt source'),
+        ),
+        migrations.CreateModel(
+            name='StockLevel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(default=0, verbose_name='Quantité en stock')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Date de modification')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_levels', to='article.article', verbose_name='Article')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='stock_levels', to='article.warehouse', verbose_name='Entrepôt')),
+            ],
+            options={
+                'verbose_name': 'Niveau de stock',
+                'verbose_name_plural': 'Niveaux de stock',
+                'indexes': [models.Index(fields=['warehouse', 'article'], name='article_sto_warehou_eb299b_idx')],
+                'unique_together': {('article', 'warehouse')},
+            },
+        ),
+        migrations.RunPython(move_stock_to_default_warehouse, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+from django.db.models import F
+
+
+# Statuts écrits par l'ancien endpoint de changement de statut
+LEGACY_STATUSES = {
+    "en_attente": "pending",
+    "confirmee": "confirmed",
+    "en_cours": "shipped",
+    "livree": "delivered",
+    "annulee": "cancelled",
+}
+STATUS_KEY = "orders_status:{}"
+
+
+def normalize_order_statuses(apps, schema_editor):
+    Order = apps.get_model("article", "Order")
+    DashboardCounter = apps.get_model("article", "DashboardCounter")
+    for legacy, status in LEGACY_STATUSES.items():
+        Order.objects.filter(status=legacy).update(status=status)
+
+        # Les compteurs du tableau de bord suivent les commandes
+        old = DashboardCounter.objects.filter(key=STATUS_KEY.format(legacy)).first()
+        if old is None:
+            continue
+        new, created = DashboardCounter.objects.get_or_create(
+            key=STATUS_KEY.format(status), defaults={"value": old.value}
+        )
+        if not created:
+            DashboardCounter.objects.filter(pk=new.pk).update(value=F("value") + old.value)
+        old.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("article", "0013_warehouses"),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_order_statuses, migrations.RunPython.noop),
+    ]
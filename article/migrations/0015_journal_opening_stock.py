@@ -0,0 +1,68 @@
+from django.db import migrations
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+
+INFLOW_TYPES = ["in", "adjustment"]
+OUTFLOW_TYPES = ["out"]
+# Copie de StockMovement.OPENING_REFERENCE, figée pour cette migration
+OPENING_REFERENCE = "Reprise du stock initial"
+
+
+def journal_opening_stock(apps, schema_editor):
+    """
+    Ajoute à chaque article le mouvement qui explique l'écart entre sa
+    quantité et la somme de ses mouvements (quantité saisie à la création,
+    corrections directes), pour que le stock historique se rejoue depuis 0.
+    Un écart positif est daté de la création de l'article, un écart
+    négatif de la migration.
+    """
+    Article = apps.get_model("article", "Article")
+    StockMovement = apps.get_model("article", "StockMovement")
+    Warehouse = apps.get_model("article", "Warehouse")
+
+    journal = {
+        row["article_id"]: (row["inflow"] or 0) - (row["outflow"] or 0)
+        for row in StockMovement.objects.order_by()
+        .values("article_id")
+        .annotate(
+            inflow=Sum("quantity", filter=Q(movement_type__in=INFLOW_TYPES)),
+            outflow=Sum("quantity", filter=Q(movement_type__in=OUTFLOW_TYPES)),
+        )
+    }
+    warehouse_id = None
+    now = timezone.now()
+    movements = []
+    for article_id, quantity, created_at in Article.objects.values_list(
+        "id", "quantity", "created_at"
+    ).iterator():
+        gap = quantity - journal.get(article_id, 0)
+        if not gap:
+            continue
+        if warehouse_id is None:
+            warehouse_id = Warehouse.objects.get_or_create(
+                code="PRINCIPAL", defaults={"name": "Entrepôt principal"}
+            )[0].pk
+        movements.append(
+            StockMovement(
+                article_id=article_id,
+                movement_type="adjustment" if gap > 0 else "out",
+                quantity=abs(gap),
+                reference_document=OPENING_REFERENCE,
+                destination_warehouse_id=warehouse_id if gap > 0 else None,
+                source_warehouse_id=None if gap > 0 else warehouse_id,
+                created_at=created_at if gap > 0 else now,
+            )
+        )
+    StockMovement.objects.bulk_create(movements, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("article", "0014_order_status_vocabulary"),
+    ]
+
+    operations = [
+        migrations.RunPython(journal_opening_stock, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,8 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import Case, Count, ExpressionWrapper, F, Sum, Value, When
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 from django.core.validators import MinValueValidator
 
@@ -22,6 +26,9 @@ class Category(models.Model):
         verbose_name="Description",
         help_text="Description optionnelle de la catégorie",
     )
+    updated_at = models.DateTimeField(
+        auto_now=True, db_index=True, verbose_name="Date de modification"
+    )
 
     class Meta:
         verbose_name = "Catégorie"
@@ -35,6 +42,40 @@ class Category(models.Model):
         return reverse("category-detail", kwargs={"pk": self.pk})
 
 
+class WarehouseManager(models.Manager):
+    def default_id(self):
+        """
+        Id de l'entrepôt par défaut, qui reçoit les mouvements sans entrepôt
+        et les modifications directes de ``Article.quantity``.
+        """
+        warehouse, _ = self.get_or_create(
+            code=Warehouse.DEFAULT_CODE, defaults={"name": "Entrepôt principal"}
+        )
+        return warehouse.pk
+
+
+class Warehouse(models.Model):
+    """
+    Lieu de stockage. Le stock de chaque article y est tenu dans ``StockLevel``.
+    """
+
+    DEFAULT_CODE = "PRINCIPAL"
+
+    code = models.CharField(max_length=20, unique=True, verbose_name="Code")
+    name = models.CharField(max_length=100, verbose_name="Nom de l'entrepôt")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = WarehouseManager()
+
+    class Meta:
+        verbose_name = "Entrepôt"
+        verbose_name_plural = "Entrepôts"
+        ordering = ["code"]
+
+    def __str__(self):
+        return f"{self.code} - {self.name}"
+
+
 import uuid
 
 
@@ -57,6 +98,13 @@ class Article(models.Model):
         verbose_name="Image de l'article",
         help_text="Image représentant l'article (optionnel)",
     )
+    image_renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name="Miniatures de l'image",
+        help_text="Image source et chemins des miniatures générées (voir article.thumbnails)",
+    )
     category = models.ForeignKey(
         Category,
         on_delete=models.SET_NULL,
@@ -83,6 +131,21 @@ class Article(models.Model):
     created_at = models.DateTimeField(
         auto_now_add=True, verbose_name="Date de création"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True, db_index=True, verbose_name="Date de modification"
+    )
+    # Colonne générée par la base : toujours exacte, y compris après un
+    # QuerySet.update(), et indexée pour filtrer les articles critiques
+    is_critical = models.GeneratedField(
+        expression=Case(
+            When(quantity__lte=F("critical_threshold"), then=Value(True)),
+            default=Value(False),
+        ),
+        output_field=models.BooleanField(),
+        db_persist=True,
+        db_index=True,
+        verbose_name="Stock critique",
+    )
 
     class Meta:
         verbose_name = "Article"
@@ -92,12 +155,17 @@ class Article(models.Model):
     def __str__(self):
         return f"{self.name} ({self.reference})"
 
-    @property
-    def is_critical(self):
+    def save(self, *args, **kwargs):
         """
-        Indique si la quantité est inférieure ou égale au seuil critique.
+        Enregistrement dans une transaction, signaux compris. Une modification
+        directe de ``quantity`` verrouille d'abord le niveau de l'entrepôt par
+        défaut (``check_default_stock_level``), puis écrit l'article, puis ce
+        niveau (``sync_default_stock_level``) : niveaux avant articles, comme
+        ``StockMovement.save`` et ``stock.ingest_movements``, pour éviter les
+        interblocages.
         """
-        return self.quantity <= self.critical_threshold
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def get_absolute_url(self):
         return reverse("article-detail", kwargs={"pk": self.pk})
@@ -152,6 +220,17 @@ class StockMovement(models.Model):
         ("adjustment", "Ajustement"),
         ("transfer", "Transfert"),
     ]
+    # Types qui augmentent / diminuent le stock (un transfert est neutre)
+    INFLOW_TYPES = ["in", "adjustment"]
+    OUTFLOW_TYPES = ["out"]
+    # Document des mouvements qui journalisent une modification directe de
+    # Article.quantity (création, correction) : le stock est déjà à jour
+    DIRECT_EDIT_REFERENCE = "Modification directe de la quantité"
+    # Document des mouvements de reprise écrits par la migration 0015
+    OPENING_REFERENCE = "Reprise du stock initial"
+    # Écritures de journal : elles reconstituent l'historique du stock mais
+    # ne sont ni des consommations ni de l'activité
+    JOURNAL_REFERENCES = [DIRECT_EDIT_REFERENCE, OPENING_REFERENCE]
 
     article = models.ForeignKey(
         Article,
@@ -172,6 +251,24 @@ class StockMovement(models.Model):
         help_text="Numéro de bon, facture, etc.",
     )
     # notes = models.TextField(blank=True, verbose_name="Notes")
+    source_warehouse = models.ForeignKey(
+        Warehouse,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="outgoing_movements",
+        verbose_name="Entrepôt source",
+        help_text="Sorties et transferts (entrepôt par défaut si vide)",
+    )
+    destination_warehouse = models.ForeignKey(
+        Warehouse,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="incoming_movements",
+        verbose_name="Entrepôt de destination",
+        help_text="Entrées, ajustements et transferts (entrepôt par défaut si vide)",
+    )
     user = models.ForeignKey(
         User,
         on_delete=models.SET_NULL,
@@ -187,24 +284,235 @@ class StockMovement(models.Model):
         verbose_name = "Mouvement de stock"
         verbose_name_plural = "Mouvements de stock"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at", "id"]),
+            models.Index(fields=["article", "created_at"]),
+            models.Index(fields=["movement_type", "created_at"]),
+        ]
 
     def __str__(self):
         return f"{self.get_movement_type_display()} - {self.article.name} ({self.quantity})"
 
+    @staticmethod
+    def signed_quantity(movement_type, quantity):
+        """
+        Variation de stock induite par un mouvement (négative pour une sortie).
+        """
+        if movement_type in StockMovement.INFLOW_TYPES:
+            return quantity
+        if movement_type in StockMovement.OUTFLOW_TYPES:
+            return -quantity
+        return 0
+
+    def resolve_warehouses(self, default_id=None):
+        """
+        Complète les entrepôts du mouvement : l'entrepôt par défaut remplace
+        celui qui manque, et l'entrepôt inutile pour ce type est vidé.
+        """
+        if self.movement_type == "transfer":
+            if (
+                self.source_warehouse_id is None
+                or self.destination_warehouse_id is None
+                or self.source_warehouse_id == self.destination_warehouse_id
+            ):
+                raise ValueError("Un transfert nécessite deux entrepôts distincts")
+            return
+        if self.movement_type in self.OUTFLOW_TYPES:
+            self.source_warehouse_id = (
+                self.source_warehouse_id or default_id or Warehouse.objects.default_id()
+            )
+            self.destination_warehouse_id = None
+        else:
+            self.destination_warehouse_id = (
+                self.destination_warehouse_id
+                or default_id
+                or Warehouse.objects.default_id()
+            )
+            self.source_warehouse_id = None
+
     def save(self, *args, **kwargs):
         """
         Mise à jour automatique du stock à la création du mouvement.
+
+        Le niveau de l'entrepôt concerné est modifié par un UPDATE
+        conditionnel (une sortie n'est acceptée que si ce niveau suffit),
+        puis le total ``Article.quantity`` reçoit la même variation. Un
+        transfert ne modifie que les deux niveaux, dans une transaction, et
+        ne touche pas la ligne de l'article.
         """
-        if self.pk is None:  # Nouveau mouvement
-            if self.movement_type in ["in", "adjustment"]:
-                self.article.quantity += self.quantity
-            elif self.movement_type == "out":
-                if self.article.quantity >= self.quantity:
-                    self.article.quantity -= self.quantity
+        if self.pk is not None:
+            return super().save(*args, **kwargs)
+
+        self.resolve_warehouses()
+        if self.movement_type == "transfer":
+            with transaction.atomic():
+                StockLevel.objects.transfer(
+                    self.article_id,
+                    self.source_warehouse_id,
+                    self.destination_warehouse_id,
+                    self.quantity,
+                )
+                return super().save(*args, **kwargs)
+
+        delta = self.signed_quantity(self.movement_type, self.quantity)
+        with transaction.atomic():
+            if delta:
+                warehouse_id = (
+                    self.destination_warehouse_id if delta > 0 else self.source_warehouse_id
+                )
+                if not StockLevel.objects.adjust(self.article_id, warehouse_id, delta):
+                    raise ValueError("Quantité insuffisante en stock")
+
+                articles = Article.objects.filter(pk=self.article_id)
+                # update() ignore auto_now : updated_at est posé explicitement
+                if delta > 0:
+                    updated = articles.update(
+                        quantity=F("quantity") + delta, updated_at=timezone.now()
+                    )
                 else:
+                    updated = articles.filter(quantity__gte=self.quantity).update(
+                        quantity=F("quantity") - self.quantity,
+                        updated_at=timezone.now(),
+                    )
+                if not updated:
                     raise ValueError("Quantité insuffisante en stock")
-            self.article.save()
-        super().save(*args, **kwargs)
+
+                from .signals import stock_changed
+
+                quantity, critical_threshold = articles.values_list(
+                    "quantity", "critical_threshold"
+                ).get()
+                if StockMovement.article.is_cached(self):
+                    self.article.quantity = quantity
+                stock_changed.send(
+                    sender=Article,
+                    article_id=self.article_id,
+                    quantity=quantity,
+                    critical_threshold=critical_threshold,
+                    was_critical=quantity - delta <= critical_threshold,
+                )
+            super().save(*args, **kwargs)
+
+
+class StockLevelQuerySet(models.QuerySet):
+    def ensure(self, pairs):
+        """Crée à zéro les niveaux ``(article_id, warehouse_id)`` manquants"""
+        self.bulk_create(
+            [
+                StockLevel(article_id=article_id, warehouse_id=warehouse_id)
+                for article_id, warehouse_id in pairs
+            ],
+            ignore_conflicts=True,
+        )
+
+    def adjust(self, article_id, warehouse_id, delta):
+        """
+        Applique ``delta`` au niveau d'un article dans un entrepôt, en un
+        UPDATE conditionnel. Retourne False si le stock y est insuffisant.
+        """
+        levels = self.filter(article_id=article_id, warehouse_id=warehouse_id)
+        now = timezone.now()
+        if delta >= 0:
+            if levels.update(quantity=F("quantity") + delta, updated_at=now):
+                return True
+            self.ensure([(article_id, warehouse_id)])
+            return bool(levels.update(quantity=F("quantity") + delta, updated_at=now))
+        quantity = -delta
+        return bool(
+            levels.filter(quantity__gte=quantity).update(
+                quantity=F("quantity") - quantity, updated_at=now
+            )
+        )
+
+    def transfer(self, article_id, source_id, destination_id, quantity):
+        """
+        Déplace ``quantity`` d'un entrepôt à l'autre : deux UPDATE dans la
+        transaction courante, dans l'ordre des entrepôts pour éviter les
+        interblocages. Lève ``ValueError`` si la source est insuffisante.
+        """
+        for warehouse_id, delta in sorted(
+            [(source_id, -quantity), (destination_id, quantity)]
+        ):
+            if not self.adjust(article_id, warehouse_id, delta):
+                raise ValueError("Quantité insuffisante dans l'entrepôt source")
+
+
+class StockLevel(models.Model):
+    """
+    Stock d'un article dans un entrepôt.
+
+    ``Article.quantity`` reste le total de tous les entrepôts, mis à jour
+    de façon incrémentale par les entrées et sorties ; chaque entrepôt a
+    sa propre ligne, de sorte que les écritures d'entrepôts différents ne
+    se disputent pas le même verrou.
+    """
+
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="stock_levels",
+        verbose_name="Article",
+    )
+    warehouse = models.ForeignKey(
+        Warehouse,
+        on_delete=models.PROTECT,
+        related_name="stock_levels",
+        verbose_name="Entrepôt",
+    )
+    quantity = models.PositiveIntegerField(default=0, verbose_name="Quantité en stock")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Date de modification")
+
+    objects = StockLevelQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Niveau de stock"
+        verbose_name_plural = "Niveaux de stock"
+        unique_together = ["article", "warehouse"]
+        indexes = [models.Index(fields=["warehouse", "article"])]
+
+    def __str__(self):
+        return f"{self.article_id} @ {self.warehouse_id} : {self.quantity}"
+
+
+def total_price_expression(prefix=""):
+    """
+    Expression SQL de ``quantity_ordered * unit_price`` d'une ligne de commande.
+    """
+    return ExpressionWrapper(
+        F(f"{prefix}quantity_ordered") * F(f"{prefix}unit_price"),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+def remaining_quantity_expression(prefix=""):
+    """
+    Expression SQL de la quantité restant à recevoir d'une ligne de commande.
+
+    Un CASE évite de soustraire des colonnes non signées au-delà de zéro
+    (erreur de dépassement sous MySQL).
+    """
+    ordered = F(f"{prefix}quantity_ordered")
+    return Case(
+        When(**{f"{prefix}quantity_received__gte": ordered}, then=Value(0)),
+        default=ordered - F(f"{prefix}quantity_received"),
+        output_field=models.PositiveIntegerField(),
+    )
+
+
+class OrderQuerySet(models.QuerySet):
+    def with_item_stats(self):
+        """
+        Ajoute ``item_count`` (nombre de lignes) et ``outstanding_quantity``
+        (quantité restant à recevoir) calculés en base.
+        """
+        return self.annotate(
+            item_count=Count("order_items"),
+            outstanding_quantity=Coalesce(
+                Sum(remaining_quantity_expression("order_items__")),
+                Value(0),
+                output_field=models.PositiveIntegerField(),
+            ),
+        )
 
 
 class Order(models.Model):
@@ -219,6 +527,15 @@ class Order(models.Model):
         ("delivered", "Livrée"),
         ("cancelled", "Annulée"),
     ]
+    # Machine à états : statut -> statuts suivants autorisés. Une commande
+    # peut être livrée sans avoir été marquée expédiée (réception directe).
+    TRANSITIONS = {
+        "pending": ["confirmed", "delivered", "cancelled"],
+        "confirmed": ["shipped", "delivered", "cancelled"],
+        "shipped": ["delivered"],
+        "delivered": [],
+        "cancelled": [],
+    }
 
     order_number = models.CharField(
         max_length=50, unique=True, verbose_name="Numéro de commande"
@@ -259,10 +576,13 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = OrderQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Commande"
         verbose_name_plural = "Commandes"
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["-created_at", "id"])]
 
     def __str__(self):
         return f"Commande {self.order_number} - {self.supplier.username}"
@@ -270,15 +590,61 @@ class Order(models.Model):
     def get_absolute_url(self):
         return reverse("order-detail", kwargs={"pk": self.pk})
 
+    @staticmethod
+    def new_number():
+        """
+        Numéro de commande horodaté. Le suffixe aléatoire le garde unique
+        quand plusieurs commandes sont créées dans la même seconde.
+        """
+        return f"ORD-{timezone.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8].upper()}"
+
+    @classmethod
+    def allowed_from(cls, new_status):
+        """Statuts depuis lesquels une commande peut passer à ``new_status``"""
+        return [
+            current for current, targets in cls.TRANSITIONS.items() if new_status in targets
+        ]
+
+    @classmethod
+    def can_transition(cls, current_status, new_status):
+        return new_status in cls.TRANSITIONS.get(current_status, [])
+
     def calculate_total(self):
         """
-        Calcule le total de la commande.
+        Calcule le total de la commande par une agrégation SQL
+        (somme de quantity_ordered * unit_price) et ne met à jour que
+        les colonnes concernées.
         """
-        self.total_amount = sum(item.total_price for item in self.order_items.all())
-        self.save()
+        total = self.order_items.aggregate(total=Sum("total_price"))["total"]
+        self.total_amount = total or Decimal("0")
+        self.updated_at = timezone.now()
+        Order.objects.filter(pk=self.pk).update(
+            total_amount=self.total_amount, updated_at=self.updated_at
+        )
         return self.total_amount
 
 
+class OrderItemQuerySet(models.QuerySet):
+    def with_totals(self):
+        """
+        Ajoute ``total_price`` et ``remaining_quantity`` calculés en base, afin
+        de pouvoir trier, filtrer et agréger sur ces valeurs.
+        """
+        return self.annotate(
+            total_price=total_price_expression(),
+            remaining_quantity=remaining_quantity_expression(),
+        )
+
+
+class OrderItemManager(models.Manager.from_queryset(OrderItemQuerySet)):
+    """
+    Gestionnaire par défaut : toutes les lignes chargées portent les annotations.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().with_totals()
+
+
 class OrderItem(models.Model):
     """
     Article contenu dans une commande fournisseur.
@@ -308,27 +674,56 @@ class OrderItem(models.Model):
         validators=[MinValueValidator(0)],
         verbose_name="Prix unitaire",
     )
+    created_at = models.DateTimeField(
+        default=timezone.now, verbose_name="Date d'ajout"
+    )
+
+    objects = OrderItemManager()
+
+    # Valeurs calculées que les annotations SQL peuvent fournir
+    ANNOTATED_FIELDS = ("total_price", "remaining_quantity")
 
     class Meta:
         verbose_name = "Article de commande"
         verbose_name_plural = "Articles de commande"
         unique_together = ["order", "article"]
+        indexes = [models.Index(fields=["-created_at", "id"])]
 
     def __str__(self):
         return f"{self.article.name} - {self.quantity_ordered} unités"
 
+    def save(self, *args, **kwargs):
+        # Les valeurs annotées ne reflètent plus les colonnes modifiées
+        for name in self.ANNOTATED_FIELDS:
+            self.__dict__.pop(f"_annotated_{name}", None)
+        super().save(*args, **kwargs)
+
     @property
     def total_price(self):
+        annotated = self.__dict__.get("_annotated_total_price")
+        if annotated is not None:
+            return annotated
         return self.quantity_ordered * self.unit_price
 
+    @total_price.setter
+    def total_price(self, value):
+        self.__dict__["_annotated_total_price"] = value
+
     @property
     def is_fully_received(self):
         return self.quantity_received >= self.quantity_ordered
 
     @property
     def remaining_quantity(self):
+        annotated = self.__dict__.get("_annotated_remaining_quantity")
+        if annotated is not None:
+            return annotated
         return max(0, self.quantity_ordered - self.quantity_received)
 
+    @remaining_quantity.setter
+    def remaining_quantity(self, value):
+        self.__dict__["_annotated_remaining_quantity"] = value
+
 
 
 
@@ -353,3 +748,119 @@ class RestockRequest(models.Model):
 
     def __str__(self):
         return f"{self.article.name} - {self.quantity_requested} demandée par {self.requester.username}"
+
+
+class DashboardCounter(models.Model):
+    """
+    Compteur matérialisé du tableau de bord, tenu à jour de façon incrémentale.
+    """
+
+    key = models.CharField(max_length=100, unique=True, verbose_name="Clé")
+    value = models.BigIntegerField(default=0, db_index=True, verbose_name="Valeur")
+
+    class Meta:
+        verbose_name = "Compteur du tableau de bord"
+        verbose_name_plural = "Compteurs du tableau de bord"
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+
+class StockSnapshot(models.Model):
+    """
+    Quantité en stock d'un article à un instant donné.
+
+    Les instantanés de tous les articles sont pris ensemble (même
+    ``taken_at``) et servent de point de départ aux requêtes de stock
+    historique, qui n'ont alors à rejouer que les mouvements postérieurs.
+    """
+
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="stock_snapshots",
+        verbose_name="Article",
+    )
+    quantity = models.PositiveIntegerField(verbose_name="Quantité en stock")
+    taken_at = models.DateTimeField(
+        default=timezone.now, verbose_name="Date de l'instantané"
+    )
+
+    class Meta:
+        verbose_name = "Instantané de stock"
+        verbose_name_plural = "Instantanés de stock"
+        ordering = ["-taken_at"]
+        unique_together = ["taken_at", "article"]
+
+    def __str__(self):
+        return f"{self.article_id} @ {self.taken_at:%Y-%m-%d %H:%M} : {self.quantity}"
+
+
+class ArticleSearchToken(models.Model):
+    """
+    Index inversé de la recherche d'articles : un mot normalisé par ligne.
+
+    Les mots proviennent du nom, de la référence, de la catégorie et des
+    références fournisseurs ; ``weight`` cumule l'importance de chaque
+    source. Voir ``article.search``.
+    """
+
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="search_tokens",
+        verbose_name="Article",
+    )
+    token = models.CharField(max_length=64, verbose_name="Mot")
+    weight = models.PositiveSmallIntegerField(default=1, verbose_name="Poids")
+
+    class Meta:
+        verbose_name = "Mot indexé"
+        verbose_name_plural = "Mots indexés"
+        # Index (token, article) : recherche par préfixe sans lire la table
+        unique_together = ["token", "article"]
+
+    def __str__(self):
+        return f"{self.token} → {self.article_id}"
+
+
+class StockAlert(models.Model):
+    """
+    Boîte d'envoi des alertes de stock.
+
+    Une ligne est écrite, dans la transaction qui modifie le stock, chaque
+    fois qu'un article franchit son seuil critique. Les consommateurs lisent
+    les alertes non distribuées puis les marquent avec ``dispatched_at``.
+    """
+
+    LOW_STOCK = "low_stock"
+    RESTOCKED = "restocked"
+    KIND_CHOICES = [
+        (LOW_STOCK, "Stock critique"),
+        (RESTOCKED, "Stock rétabli"),
+    ]
+
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="stock_alerts",
+        verbose_name="Article",
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name="Type")
+    quantity = models.PositiveIntegerField(verbose_name="Quantité en stock")
+    critical_threshold = models.PositiveIntegerField(verbose_name="Seuil critique")
+    created_at = models.DateTimeField(
+        default=timezone.now, verbose_name="Date de l'alerte"
+    )
+    dispatched_at = models.DateTimeField(
+        null=True, blank=True, db_index=True, verbose_name="Date de distribution"
+    )
+
+    class Meta:
+        verbose_name = "Alerte de stock"
+        verbose_name_plural = "Alertes de stock"
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["-created_at", "id"])]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} - {self.article_id} ({self.quantity})"
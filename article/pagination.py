@@ -0,0 +1,69 @@
+from django.db import connections
+from rest_framework.pagination import CursorPagination
+
+
+def approximate_count(queryset, cap=10000):
+    """
+    Compte approximatif d'un queryset, sans balayer toute la table.
+
+    Sur MySQL, une table non filtrée utilise l'estimation de
+    ``information_schema``. Sinon, le comptage s'arrête à ``cap`` lignes.
+    Retourne ``(compte, est_approximatif)``.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == "mysql" and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] is not None:
+            return row[0], True
+
+    count = queryset.order_by()[: cap + 1].count()
+    if count > cap:
+        return cap, True
+    return count, False
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Pagination par curseur sur (-created_at, id) : le coût d'une page ne
+    dépend pas de sa profondeur et aucun COUNT(*) n'est exécuté.
+
+    Les clients qui ont besoin d'un total peuvent passer ``?count=approx``.
+    """
+
+    page_size = 5
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "id")
+    count_query_param = "count"
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Tri demandé par ``?ordering=`` (OrderingFilter), complété par ``id`` :
+        sur une colonne non unique (total_amount, quantity_ordered…), le
+        curseur a besoin d'un ordre stable entre les ex aequo, sinon des
+        lignes sont sautées ou répétées d'une page à l'autre.
+        """
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        if not {"id", "-id", "pk", "-pk"} & set(ordering):
+            ordering += ("id",)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.approximate = None
+        if request.query_params.get(self.count_query_param) == "approx":
+            self.approximate = approximate_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.approximate is not None:
+            count, is_approximate = self.approximate
+            response.data["count"] = count
+            response.data["count_is_approximate"] = is_approximate
+        return response
@@ -6,15 +6,16 @@
 # permissions.py
 from rest_framework.permissions import BasePermission
 
+from users.utils import has_role
+
 class IsGestionnaire(BasePermission):
     """
     Autorise l'accès uniquement aux utilisateurs appartenant au groupe 'gestionnaire'.
     """
 
     def has_permission(self, request, view):
-        return (
+        return bool(
             request.user and
             request.user.is_authenticated and
-            request.user.groups.filter(name='gestionnaire').exists() or
-            request.user.groups.filter(name='admin').exists()
+            (has_role(request.user, 'gestionnaire') or has_role(request.user, 'admin'))
         )
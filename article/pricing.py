@@ -0,0 +1,108 @@
+"""
+Matrice des prix fournisseurs : pour chaque article, prix minimum, maximum
+et médian, écart de prix, nombre de fournisseurs, fournisseur le moins cher
+et fournisseur préféré.
+
+Une seule requête sur ``ArticleSupplier`` avec des fonctions de fenêtre
+(partition par article, tri par prix) : chaque ligne porte son rang et les
+statistiques de son article, et seules les lignes utiles sont retournées
+(la moins chère, la préférée, et une ou deux lignes médianes). La médiane
+est la moyenne des lignes de rang ``2 * rang - nombre`` compris entre 0 et 2,
+c'est-à-dire la ligne du milieu (nombre impair) ou les deux lignes du
+milieu (nombre pair).
+
+Les pages calculées restent ``SUPPLIER_MATRIX_CACHE_SECONDS`` secondes dans
+le cache : un changement de prix peut donc apparaître avec ce délai.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, F, Max, Min, Q, Window
+from django.db.models.functions import RowNumber
+
+from .models import ArticleSupplier
+
+
+DEFAULT_CACHE_SECONDS = 60
+CACHE_PREFIX = "supplier-matrix"
+
+
+def cache_seconds():
+    return getattr(settings, "SUPPLIER_MATRIX_CACHE_SECONDS", DEFAULT_CACHE_SECONDS)
+
+
+def _supplier(row):
+    return {
+        "id": row["supplier_id"],
+        "username": row["supplier__username"],
+        "supplier_reference": row["supplier_reference"],
+        "price": row["supplier_price"],
+    }
+
+
+def supplier_matrix(article_ids):
+    """
+    Statistiques de prix par article de ``article_ids``, en une requête.
+    Retourne ``{article_id: {...}}`` ; les articles sans fournisseur sont absents.
+    """
+    partition = {"partition_by": [F("article_id")]}
+    rows = (
+        ArticleSupplier.objects.filter(article_id__in=article_ids)
+        .annotate(
+            rank=Window(
+                RowNumber(),
+                order_by=[F("supplier_price").asc(), F("id").asc()],
+                **partition,
+            ),
+            supplier_count=Window(Count("id"), **partition),
+            min_price=Window(Min("supplier_price"), **partition),
+            max_price=Window(Max("supplier_price"), **partition),
+        )
+        .annotate(median_gap=F("rank") * 2 - F("supplier_count"))
+        .filter(Q(rank=1) | Q(is_preferred=True) | Q(median_gap__range=(0, 2)))
+        .values(
+            "article_id",
+            "supplier_id",
+            "supplier__username",
+            "supplier_reference",
+            "supplier_price",
+            "is_preferred",
+            "rank",
+            "supplier_count",
+            "min_price",
+            "max_price",
+            "median_gap",
+        )
+        .order_by("article_id", "rank")
+    )
+
+    matrix = {}
+    medians = {}
+    for row in rows:
+        entry = matrix.get(row["article_id"])
+        if entry is None:
+            spread = row["max_price"] - row["min_price"]
+            entry = matrix[row["article_id"]] = {
+                "supplier_count": row["supplier_count"],
+                "min_price": row["min_price"],
+                "max_price": row["max_price"],
+                "median_price": None,
+                "price_spread": spread,
+                "price_spread_pct": round(spread / row["min_price"] * 100, 2)
+                if row["min_price"]
+                else None,
+                "cheapest_supplier": None,
+                "preferred_supplier": None,
+            }
+        if row["rank"] == 1:
+            entry["cheapest_supplier"] = _supplier(row)
+        if row["is_preferred"] and entry["preferred_supplier"] is None:
+            entry["preferred_supplier"] = _supplier(row)
+        if 0 <= row["median_gap"] <= 2:
+            medians.setdefault(row["article_id"], []).append(row["supplier_price"])
+
+    for article_id, prices in medians.items():
+        matrix[article_id]["median_price"] = (sum(prices) / len(prices)).quantize(
+            Decimal("0.01")
+        )
+    return matrix
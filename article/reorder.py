@@ -0,0 +1,201 @@
+# reorder.py
+"""
+Recommandations de réapprovisionnement calculées en un seul lot.
+
+Toutes les entrées sont lues par quelques requêtes agrégées (GROUP BY), puis
+combinées en un seul passage sur les articles, sans requête par article :
+
+- vitesse de consommation : sorties de stock sur une fenêtre glissante ;
+- délai de livraison réel par fournisseur : moyenne de
+  ``actual_delivery_date - order_date`` des commandes livrées ;
+- fournisseur retenu : le fournisseur préféré, sinon le moins cher ;
+- quantité déjà en commande : reliquats des commandes encore ouvertes.
+
+Point de commande = consommation pendant le délai + stock de sécurité.
+Quantité suggérée = niveau cible (délai + période de revue + sécurité)
+moins le stock disponible et la quantité en commande.
+
+Le lot calculé pour un jeu de paramètres reste ``REORDER_CACHE_SECONDS``
+secondes dans le cache : les pages de l'endpoint sont découpées dans ce
+lot au lieu de relancer le calcul sur tout le catalogue.
+"""
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, DurationField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (
+    Article,
+    ArticleSupplier,
+    Order,
+    OrderItem,
+    StockMovement,
+    remaining_quantity_expression,
+)
+
+
+WINDOW_DAYS = 90
+SAFETY_DAYS = 7
+REVIEW_DAYS = 14
+DEFAULT_LEAD_TIME_DAYS = 14
+
+DEFAULT_CACHE_SECONDS = 60
+CACHE_PREFIX = "reorder-recommendations"
+
+# Commandes dont les reliquats ne seront plus livrés
+CLOSED_ORDER_STATUSES = ["delivered", "cancelled"]
+
+FIELDS = [
+    "article_id",
+    "name",
+    "quantity",
+    "on_order",
+    "daily_consumption",
+    "supplier_id",
+    "lead_time_days",
+    "reorder_point",
+    "suggested_quantity",
+    "supplier_price",
+    "estimated_cost",
+    "needs_reorder",
+]
+
+
+def consumption_by_article(window_days):
+    since = timezone.now() - timedelta(days=window_days)
+    return dict(
+        StockMovement.objects.filter(
+            movement_type__in=StockMovement.OUTFLOW_TYPES, created_at__gte=since
+        )
+        .exclude(reference_document__in=StockMovement.JOURNAL_REFERENCES)
+        .order_by()
+        .values("article_id")
+        .annotate(total=Sum("quantity"))
+        .values_list("article_id", "total")
+    )
+
+
+def lead_time_by_supplier():
+    """
+    Délai moyen de livraison observé par fournisseur, en jours.
+    """
+    rows = (
+        Order.objects.filter(actual_delivery_date__isnull=False)
+        .order_by()
+        .values("supplier_id")
+        .annotate(
+            lead_time=Avg(
+                ExpressionWrapper(
+                    F("actual_delivery_date") - TruncDate("order_date"),
+                    output_field=DurationField(),
+                )
+            )
+        )
+        .values_list("supplier_id", "lead_time")
+    )
+    return {
+        supplier_id: max(lead_time.total_seconds() / 86400, 0)
+        for supplier_id, lead_time in rows
+        if lead_time is not None
+    }
+
+
+def chosen_suppliers():
+    """
+    ``{article_id: (supplier_id, prix)}`` : le préféré, sinon le moins cher.
+    """
+    chosen = {}
+    rows = ArticleSupplier.objects.order_by(
+        "article_id", "-is_preferred", "supplier_price", "id"
+    ).values_list("article_id", "supplier_id", "supplier_price")
+    for article_id, supplier_id, supplier_price in rows.iterator(chunk_size=5000):
+        chosen.setdefault(article_id, (supplier_id, supplier_price))
+    return chosen
+
+
+def on_order_by_article():
+    return dict(
+        OrderItem.objects.exclude(order__status__in=CLOSED_ORDER_STATUSES)
+        .order_by()
+        .values("article_id")
+        .annotate(on_order=Sum(remaining_quantity_expression()))
+        .values_list("article_id", "on_order")
+    )
+
+
+def compute_recommendations(
+    window_days=WINDOW_DAYS,
+    safety_days=SAFETY_DAYS,
+    review_days=REVIEW_DAYS,
+    default_lead_time_days=DEFAULT_LEAD_TIME_DAYS,
+):
+    """
+    Calcule la recommandation de chaque article. Retourne un itérateur de
+    dictionnaires dont les clés sont ``FIELDS``.
+    """
+    consumption = consumption_by_article(window_days)
+    lead_times = lead_time_by_supplier()
+    suppliers = chosen_suppliers()
+    on_order = on_order_by_article()
+
+    articles = Article.objects.order_by("pk").values_list("id", "name", "quantity")
+    for article_id, name, quantity in articles.iterator(chunk_size=5000):
+        daily = consumption.get(article_id, 0) / window_days
+        supplier_id, supplier_price = suppliers.get(article_id, (None, None))
+        lead_time = lead_times.get(supplier_id, default_lead_time_days)
+        pending = on_order.get(article_id) or 0
+
+        reorder_point = math.ceil(daily * (lead_time + safety_days))
+        target = math.ceil(daily * (lead_time + review_days + safety_days))
+        available = quantity + pending
+        needs_reorder = daily > 0 and available <= reorder_point
+        suggested = max(target - available, 0) if needs_reorder else 0
+
+        yield {
+            "article_id": article_id,
+            "name": name,
+            "quantity": quantity,
+            "on_order": pending,
+            "daily_consumption": round(daily, 3),
+            "supplier_id": supplier_id,
+            "lead_time_days": round(lead_time, 1),
+            "reorder_point": reorder_point,
+            "suggested_quantity": suggested,
+            "supplier_price": supplier_price,
+            "estimated_cost": (
+                supplier_price * suggested if supplier_price is not None else None
+            ),
+            "needs_reorder": needs_reorder,
+        }
+
+
+def cache_seconds():
+    return getattr(settings, "REORDER_CACHE_SECONDS", DEFAULT_CACHE_SECONDS)
+
+
+def cached_recommendations(include_all=False, **options):
+    """
+    Recommandations triées (articles à réapprovisionner d'abord, par
+    quantité suggérée décroissante), sans les autres articles sauf si
+    ``include_all``. Le lot est mis en cache par jeu de paramètres.
+    Retourne ``(date du calcul, lignes)``.
+    """
+    key = ":".join(
+        [CACHE_PREFIX, f"all={include_all}"]
+        + [f"{name}={value}" for name, value in sorted(options.items())]
+    )
+    batch = cache.get(key)
+    if batch is None:
+        rows = [
+            row
+            for row in compute_recommendations(**options)
+            if include_all or row["needs_reorder"]
+        ]
+        rows.sort(key=lambda row: (not row["needs_reorder"], -row["suggested_quantity"]))
+        batch = (timezone.now(), rows)
+        cache.set(key, batch, cache_seconds())
+    return batch
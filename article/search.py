@@ -0,0 +1,161 @@
+# search.py
+"""
+Recherche d'articles par préfixe sur un index inversé.
+
+Chaque article est découpé en mots normalisés (minuscules, sans accents)
+stockés dans ``ArticleSearchToken`` avec un poids par source. Une recherche
+est une lecture par préfixe sur l'index (token, article), groupée par
+article : son coût dépend du nombre de correspondances, non de la taille
+du catalogue. L'index est tenu à jour par les signaux de ``article.signals``.
+"""
+import re
+import unicodedata
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, When
+
+from .models import Article, ArticleSearchToken, ArticleSupplier
+
+
+# Poids de chaque source de mots
+NAME_WEIGHT = 3
+REFERENCE_WEIGHT = 4
+CATEGORY_WEIGHT = 1
+SUPPLIER_REFERENCE_WEIGHT = 2
+
+# Bonus appliqué lorsqu'un terme correspond exactement au mot indexé
+EXACT_MATCH_FACTOR = 2
+
+TOKEN_MAX_LENGTH = 64
+QUERY_MAX_TERMS = 5
+INDEX_CHUNK_SIZE = 1000
+
+_WORD_RE = re.compile(r"[0-9a-z]+")
+_REFERENCE_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f-]*")
+
+
+def normalize(text):
+    """
+    Minuscules sans accents : « Écrou M8 » devient « ecrou m8 ».
+    """
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    return "".join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    return [word[:TOKEN_MAX_LENGTH] for word in _WORD_RE.findall(normalize(text))]
+
+
+def article_tokens(name, reference, category_name, supplier_references):
+    """
+    Mots pondérés d'un article, sous la forme ``{mot: poids}``.
+    """
+    tokens = defaultdict(int)
+    for word in tokenize(name):
+        tokens[word] += NAME_WEIGHT
+    # La référence UUID est indexée entière (sans tirets) pour la recherche
+    # par préfixe
+    if reference:
+        tokens[str(reference).replace("-", "").lower()] += REFERENCE_WEIGHT
+    for word in tokenize(category_name):
+        tokens[word] += CATEGORY_WEIGHT
+    for supplier_reference in supplier_references:
+        for word in tokenize(supplier_reference):
+            tokens[word] += SUPPLIER_REFERENCE_WEIGHT
+    return tokens
+
+
+def index_articles(article_ids):
+    """
+    Recalcule les mots des articles donnés en quelques requêtes ensemblistes.
+    """
+    article_ids = list(article_ids)
+    for start in range(0, len(article_ids), INDEX_CHUNK_SIZE):
+        _index_chunk(article_ids[start:start + INDEX_CHUNK_SIZE])
+
+
+def _index_chunk(article_ids):
+    supplier_references = defaultdict(list)
+    for article_id, supplier_reference in ArticleSupplier.objects.filter(
+        article_id__in=article_ids
+    ).exclude(supplier_reference="").values_list("article_id", "supplier_reference"):
+        supplier_references[article_id].append(supplier_reference)
+
+    rows = []
+    for article_id, name, reference, category_name in Article.objects.filter(
+        pk__in=article_ids
+    ).values_list("id", "name", "reference", "category__name"):
+        tokens = article_tokens(
+            name, reference, category_name, supplier_references[article_id]
+        )
+        rows.extend(
+            ArticleSearchToken(article_id=article_id, token=token, weight=weight)
+            for token, weight in tokens.items()
+        )
+
+    with transaction.atomic():
+        ArticleSearchToken.objects.filter(article_id__in=article_ids).delete()
+        ArticleSearchToken.objects.bulk_create(rows, batch_size=INDEX_CHUNK_SIZE)
+
+
+def rebuild():
+    """
+    Reconstruit l'index de tous les articles. Retourne le nombre d'articles.
+    """
+    article_ids = list(Article.objects.order_by("pk").values_list("id", flat=True))
+    ArticleSearchToken.objects.exclude(article_id__in=article_ids).delete()
+    index_articles(article_ids)
+    return len(article_ids)
+
+
+def query_terms(query):
+    """
+    Termes d'une recherche ; un début de référence UUID (avec tirets) reste
+    un seul terme.
+    """
+    compact = normalize(query).strip()
+    if _REFERENCE_RE.fullmatch(compact):
+        return [compact.replace("-", "")[:TOKEN_MAX_LENGTH]]
+    return list(dict.fromkeys(tokenize(query)))[:QUERY_MAX_TERMS]
+
+
+def search(query, limit=10):
+    """
+    Articles dont chaque terme de ``query`` préfixe au moins un mot indexé,
+    classés par pertinence. Retourne une liste ``[(article_id, score)]``.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+
+    # istartswith donne un LIKE 'terme%' qui parcourt l'index sous MySQL
+    # (les mots indexés sont déjà en minuscules)
+    matches = [Q(token__istartswith=term) for term in terms]
+    any_match = Q()
+    for match in matches:
+        any_match |= match
+
+    per_term = {
+        f"term_{index}": Count("id", filter=match)
+        for index, match in enumerate(matches)
+    }
+    rows = (
+        ArticleSearchToken.objects.filter(any_match)
+        .order_by()
+        .values("article_id")
+        .annotate(
+            score=Sum(
+                Case(
+                    When(token__in=terms, then=F("weight") * EXACT_MATCH_FACTOR),
+                    default=F("weight"),
+                    output_field=IntegerField(),
+                )
+            ),
+            **per_term,
+        )
+        .filter(**{f"{name}__gt": 0 for name in per_term})
+        .order_by("-score", "article_id")
+        .values_list("article_id", "score")[:limit]
+    )
+    return list(rows)
@@ -1,9 +1,12 @@
 
 # serializers.py
 from rest_framework import serializers
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from .models import Category, Article, Order, OrderItem, ArticleSupplier ,StockMovement,RestockRequest
+from .models import Category, Article, Order, OrderItem, ArticleSupplier ,StockMovement,RestockRequest, StockAlert, StockLevel, Warehouse
+from . import dashboard, reorder, thumbnails
 
 User = get_user_model()
 
@@ -24,6 +27,7 @@ class ArticleSerializer(serializers.ModelSerializer):
         allow_null=True,
     )
     image = serializers.ImageField(required=False, allow_null=True)
+    image_renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = Article
@@ -39,13 +43,64 @@ class ArticleSerializer(serializers.ModelSerializer):
             "created_at",
             "is_critical",
             "image",
+            "image_renditions",
         ]
         read_only_fields = ["reference", "created_at", "is_critical"]
 
+    def save(self, **kwargs):
+        try:
+            with transaction.atomic():
+                instance = super().save(**kwargs)
+        except ValueError as exc:
+            # Baisse de quantité supérieure au stock de l'entrepôt par défaut
+            raise serializers.ValidationError({"quantity": [str(exc)]})
+        # is_critical est calculée par la base : on relit la colonne générée
+        instance.refresh_from_db(fields=["is_critical"])
+        return instance
+
+    def get_image_renditions(self, obj):
+        """URLs des miniatures par taille (vide pendant leur génération)"""
+        return thumbnails.rendition_urls(obj, self.context.get("request"))
+
+
+class PayloadArticleField(serializers.PrimaryKeyRelatedField):
+    """
+    Article d'une ligne de commande, lu avec ceux de tout le payload :
+    un seul ``in_bulk`` pour toutes les lignes (et toutes les commandes d'un
+    import), au lieu d'un SELECT par ligne.
+    """
+
+    CONTEXT_KEY = "payload_articles"
+
+    def payload_article_ids(self):
+        data = getattr(self.root, "initial_data", None)
+        orders = data if isinstance(data, list) else [data]
+        ids = set()
+        for order in orders:
+            items = order.get("order_items") if isinstance(order, dict) else None
+            for item in items if isinstance(items, list) else []:
+                try:
+                    ids.add(int(item["article"]))
+                except (KeyError, TypeError, ValueError):
+                    pass  # signalé par la validation de la ligne
+        return ids
+
+    def to_internal_value(self, data):
+        articles = self.context.get(self.CONTEXT_KEY)
+        if articles is None:
+            articles = self.get_queryset().in_bulk(self.payload_article_ids())
+            self.context[self.CONTEXT_KEY] = articles
+        try:
+            return articles[int(data)]
+        except (KeyError, TypeError, ValueError):
+            return super().to_internal_value(data)
+
 
 class OrderItemSerializer(serializers.ModelSerializer):
+    article = PayloadArticleField(queryset=Article.objects.all())
     article_name = serializers.ReadOnlyField(source="article.name")
     total_price = serializers.ReadOnlyField()
+    remaining_quantity = serializers.ReadOnlyField()
 
     class Meta:
         model = OrderItem
@@ -57,6 +112,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
             "quantity_received",
             "unit_price",
             "total_price",
+            "remaining_quantity",
         ]
         extra_kwargs = {
             "quantity_received": {"read_only": True},  # souvent géré à part
@@ -70,15 +126,37 @@ class OrderItemSerializer(serializers.ModelSerializer):
         return value
 
 
+def prefetch_order_items(orders):
+    """Lignes et articles des commandes en deux requêtes, pour la réponse"""
+    prefetch_related_objects(
+        orders,
+        Prefetch("order_items", queryset=OrderItem.objects.select_related("article")),
+    )
+
+
+class OrderListSerializer(serializers.ListSerializer):
+    """
+    Import de plusieurs commandes dans une seule transaction.
+    """
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            return [self.child.create_order(attrs) for attrs in validated_data]
+
+
 class OrderSerializer(serializers.ModelSerializer):
     supplier_name = serializers.ReadOnlyField(source="supplier.username")
     user = serializers.HiddenField(
         default=serializers.CurrentUserDefault()
     )  # Auto fill user
     order_items = OrderItemSerializer(many=True)
+    # Annotations de Order.objects.with_item_stats(), omises si absentes
+    item_count = serializers.IntegerField(read_only=True)
+    outstanding_quantity = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Order
+        list_serializer_class = OrderListSerializer
         fields = [
             "id",
             "order_number",
@@ -92,9 +170,27 @@ class OrderSerializer(serializers.ModelSerializer):
             "user",
             "created_at",
             "updated_at",
+            "item_count",
+            "outstanding_quantity",
             "order_items",
         ]
-        read_only_fields = ["total_amount", "created_at", "updated_at"]
+        # Le statut ne change que par les transitions (orders/{id}/status/,
+        # orders/bulk-status/) et la réception (orders/{id}/receive/)
+        read_only_fields = [
+            "order_number",
+            "status",
+            "total_amount",
+            "created_at",
+            "updated_at",
+        ]
+
+    def validate_order_items(self, value):
+        articles = [item["article"].pk for item in value]
+        if len(articles) != len(set(articles)):
+            raise serializers.ValidationError(
+                "Un même article ne peut apparaître qu'une fois par commande."
+            )
+        return value
 
     def validate(self, data):
         order_date = data.get("order_date", timezone.now())
@@ -117,37 +213,49 @@ class OrderSerializer(serializers.ModelSerializer):
 
         return data
 
-    def create(self, validated_data):
-        order_items_data = validated_data.pop("order_items")
-        user = self.context["request"].user
-        validated_data["user"] = user
-
-        validated_data["order_number"] = (
-            f"ORD-{timezone.now().strftime('%Y%m%d%H%M%S')}"
+    @staticmethod
+    def _create_items(order, order_items_data):
+        items = OrderItem.objects.bulk_create(
+            [OrderItem(order=order, **item_data) for item_data in order_items_data],
+            batch_size=500,
         )
+        dashboard.count_order_items(item.article_id for item in items)
 
-        order = Order.objects.create(**validated_data)
+    def create_order(self, validated_data):
+        """
+        Crée la commande et ses lignes (insérées en masse) puis calcule
+        le total en base, le tout dans une seule transaction.
+        """
+        order_items_data = validated_data.pop("order_items")
+        validated_data["user"] = self.context["request"].user
+        validated_data["order_number"] = Order.new_number()
 
-        for item_data in order_items_data:
-            OrderItem.objects.create(order=order, **item_data)
+        with transaction.atomic():
+            order = Order.objects.create(**validated_data)
+            self._create_items(order, order_items_data)
+            order.calculate_total()
 
-        order.calculate_total()
+        return order
 
+    def create(self, validated_data):
+        order = self.create_order(validated_data)
+        prefetch_order_items([order])
         return order
 
     def update(self, instance, validated_data):
         order_items_data = validated_data.pop("order_items", None)
 
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
+        with transaction.atomic():
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
 
-        if order_items_data is not None:
-            instance.order_items.all().delete()
-            for item_data in order_items_data:
-                OrderItem.objects.create(order=instance, **item_data)
+            if order_items_data is not None:
+                instance.order_items.all().delete()
+                self._create_items(instance, order_items_data)
 
-        instance.calculate_total()
+            instance.calculate_total()
+        prefetch_order_items([instance])
         return instance
 
 
@@ -198,6 +306,48 @@ class ArticleSupplierSerializer(serializers.ModelSerializer):
 
 
 
+def validate_transfer(data):
+    """Un transfert doit indiquer deux entrepôts distincts"""
+    if data.get("movement_type") != "transfer":
+        return data
+    source = data.get("source_warehouse")
+    destination = data.get("destination_warehouse")
+    if source is None or destination is None:
+        raise serializers.ValidationError(
+            "Un transfert nécessite un entrepôt source et un entrepôt de destination."
+        )
+    if source == destination:
+        raise serializers.ValidationError(
+            "Les entrepôts source et destination doivent être différents."
+        )
+    return data
+
+
+class WarehouseSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Warehouse
+        fields = ["id", "code", "name", "created_at"]
+        read_only_fields = ["id", "created_at"]
+
+
+class StockLevelSerializer(serializers.ModelSerializer):
+    article_name = serializers.ReadOnlyField(source="article.name")
+    warehouse_code = serializers.ReadOnlyField(source="warehouse.code")
+
+    class Meta:
+        model = StockLevel
+        fields = [
+            "id",
+            "article",
+            "article_name",
+            "warehouse",
+            "warehouse_code",
+            "quantity",
+            "updated_at",
+        ]
+        read_only_fields = fields
+
+
 class StockMovementSerializer(serializers.ModelSerializer):
     article_name = serializers.ReadOnlyField(source="article.name")
     user_name = serializers.ReadOnlyField(source="user.username")
@@ -210,23 +360,101 @@ class StockMovementSerializer(serializers.ModelSerializer):
             "article_name",
             "movement_type",
             "quantity",
+            "source_warehouse",
+            "destination_warehouse",
             "reference_document",
             "user",
             "user_name",
             "created_at"
         ]
         read_only_fields = ["id", "created_at", "user", "user_name"]
+
+    def validate(self, data):
+        return validate_transfer(data)
     
     def create(self, validated_data):
         # Injecter l'utilisateur courant comme responsable du mouvement
         validated_data["user"] = self.context["request"].user
-        return super().create(validated_data)
+        try:
+            return super().create(validated_data)
+        except ValueError as exc:
+            raise serializers.ValidationError({"quantity": [str(exc)]})
     
 
+class StockMovementBulkItemSerializer(serializers.Serializer):
+    """
+    Ligne d'un import en masse de mouvements.
+
+    L'article est validé en une seule requête lors de l'application du lot,
+    et non ligne par ligne.
+    """
+
+    article = serializers.IntegerField()
+    movement_type = serializers.ChoiceField(choices=StockMovement.MOVEMENT_TYPES)
+    quantity = serializers.IntegerField(min_value=1)
+    reference_document = serializers.CharField(
+        max_length=100, required=False, allow_blank=True, default=""
+    )
+    source_warehouse = serializers.IntegerField(required=False, allow_null=True)
+    destination_warehouse = serializers.IntegerField(required=False, allow_null=True)
+
+    def validate(self, data):
+        return validate_transfer(data)
+
+
 class RestockRequestSerializer(serializers.ModelSerializer):
     requester = serializers.StringRelatedField(read_only=True)  # pour afficher le nom
 
     class Meta:
         model = RestockRequest
         fields = '__all__'
-        read_only_fields = ['requester', 'created_at', 'status']
\ No newline at end of file
+        read_only_fields = ['requester', 'created_at', 'status']
+
+
+class StockAlertSerializer(serializers.ModelSerializer):
+    article_name = serializers.ReadOnlyField(source="article.name")
+
+    class Meta:
+        model = StockAlert
+        fields = [
+            "id",
+            "article",
+            "article_name",
+            "kind",
+            "quantity",
+            "critical_threshold",
+            "created_at",
+            "dispatched_at",
+        ]
+        read_only_fields = fields
+
+
+class OrderReceiptLineSerializer(serializers.Serializer):
+    order_item = serializers.IntegerField()
+    # Quantité reçue cumulée de la ligne (et non la quantité de cette livraison)
+    quantity_received = serializers.IntegerField(min_value=0)
+
+
+class OrderReceiptSerializer(serializers.Serializer):
+    """
+    Réception de tout ou partie d'une commande (voir article.stock.receive_order).
+    """
+
+    items = OrderReceiptLineSerializer(many=True, allow_empty=False)
+    warehouse = serializers.PrimaryKeyRelatedField(
+        queryset=Warehouse.objects.all(), required=False, allow_null=True
+    )
+
+
+class ReorderParamsSerializer(serializers.Serializer):
+    """
+    Paramètres du calcul de réapprovisionnement (voir article.reorder).
+    """
+
+    window_days = serializers.IntegerField(min_value=1, default=reorder.WINDOW_DAYS)
+    safety_days = serializers.IntegerField(min_value=0, default=reorder.SAFETY_DAYS)
+    review_days = serializers.IntegerField(min_value=0, default=reorder.REVIEW_DAYS)
+    default_lead_time_days = serializers.IntegerField(
+        min_value=0, default=reorder.DEFAULT_LEAD_TIME_DAYS
+    )
+    all = serializers.BooleanField(default=False)
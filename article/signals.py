@@ -0,0 +1,356 @@
+# signals.py - Maintien incrémental des compteurs du tableau de bord, des miniatures
+# et de l'index de recherche
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+
+from . import dashboard, search, thumbnails
+from .models import (
+    Article,
+    ArticleSupplier,
+    Category,
+    DashboardCounter,
+    Order,
+    OrderItem,
+    StockAlert,
+    StockLevel,
+    StockMovement,
+    Warehouse,
+)
+
+
+User = get_user_model()
+
+# Envoyé par les chemins d'écriture qui modifient le stock d'un article.
+# Arguments : article_id, quantity, critical_threshold, was_critical
+stock_changed = Signal()
+
+
+@receiver(stock_changed)
+def update_critical_counter(sender, quantity, critical_threshold, was_critical, **kwargs):
+    """Ajuste le compteur d'articles critiques lors d'un franchissement de seuil"""
+    is_critical = quantity <= critical_threshold
+    if is_critical != was_critical:
+        dashboard.bump(dashboard.CRITICAL_ARTICLES, 1 if is_critical else -1)
+
+
+@receiver(stock_changed)
+def write_stock_alert(sender, article_id, quantity, critical_threshold, was_critical, **kwargs):
+    """Écrit une alerte dans la boîte d'envoi lors d'un franchissement de seuil"""
+    is_critical = quantity <= critical_threshold
+    if is_critical != was_critical:
+        StockAlert.objects.create(
+            article_id=article_id,
+            kind=StockAlert.LOW_STOCK if is_critical else StockAlert.RESTOCKED,
+            quantity=quantity,
+            critical_threshold=critical_threshold,
+        )
+
+
+# =============================================================================
+# ARTICLES ET CATÉGORIES
+# =============================================================================
+
+@receiver(pre_save, sender=Article)
+def remember_article_state(sender, instance, **kwargs):
+    previous = (
+        Article.objects.filter(pk=instance.pk)
+        .values_list("quantity", "critical_threshold", "name", "category_id")
+        .first()
+        if instance.pk
+        else None
+    )
+    instance._previous_stock = previous[:2] if previous else None
+    instance._previous_search_fields = previous[2:] if previous else None
+
+
+@receiver(pre_save, sender=Article)
+def check_default_stock_level(sender, instance, **kwargs):
+    """
+    Une baisse directe de ``Article.quantity`` est prise sur l'entrepôt par
+    défaut : elle ne peut pas dépasser le stock qui s'y trouve.
+
+    Toute modification de la quantité verrouille ce niveau avant l'UPDATE de
+    l'article (ordre des verrous : voir ``Article.save``).
+    """
+    previous = instance._previous_stock
+    if previous is None or instance.quantity == previous[0]:
+        return
+    available = (
+        StockLevel.objects.select_for_update()
+        .filter(article_id=instance.pk, warehouse_id=Warehouse.objects.default_id())
+        .values_list("quantity", flat=True)
+        .first()
+        or 0
+    )
+    if previous[0] - instance.quantity > available:
+        raise ValueError(
+            "Quantité insuffisante dans l'entrepôt par défaut : "
+            "enregistrer une sortie sur l'entrepôt concerné"
+        )
+
+
+@receiver(post_save, sender=Article)
+def sync_default_stock_level(sender, instance, created, **kwargs):
+    """
+    Reporte une modification directe de ``Article.quantity`` (création,
+    correction) sur l'entrepôt par défaut, pour que le total reste la somme
+    des niveaux, et la journalise comme mouvement pour que le stock
+    historique (``article.snapshots``) la retrouve. Les mouvements de stock
+    passent par ``update()`` et ne déclenchent pas ce signal.
+    """
+    previous = getattr(instance, "_previous_stock", None)
+    delta = instance.quantity - (previous[0] if previous else 0)
+    if not delta:
+        return
+    warehouse_id = Warehouse.objects.default_id()
+    if not StockLevel.objects.adjust(instance.pk, warehouse_id, delta):
+        raise ValueError("Quantité insuffisante dans l'entrepôt par défaut")
+    # bulk_create n'appelle pas save() : le stock n'est pas modifié une 2e fois
+    StockMovement.objects.bulk_create(
+        [
+            StockMovement(
+                article_id=instance.pk,
+                movement_type="adjustment" if delta > 0 else "out",
+                quantity=abs(delta),
+                reference_document=StockMovement.DIRECT_EDIT_REFERENCE,
+                destination_warehouse_id=warehouse_id if delta > 0 else None,
+                source_warehouse_id=None if delta > 0 else warehouse_id,
+            )
+        ]
+    )
+
+
+@receiver(post_save, sender=Article)
+def count_article(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_stock", None)
+    if created or previous is None:
+        dashboard.bump(dashboard.ARTICLES)
+        # is_critical est une colonne générée, relue en base après save()
+        if instance.quantity <= instance.critical_threshold:
+            dashboard.bump(dashboard.CRITICAL_ARTICLES)
+        return
+
+    if previous != (instance.quantity, instance.critical_threshold):
+        old_quantity, old_threshold = previous
+        stock_changed.send(
+            sender=Article,
+            article_id=instance.pk,
+            quantity=instance.quantity,
+            critical_threshold=instance.critical_threshold,
+            was_critical=old_quantity <= old_threshold,
+        )
+
+
+@receiver(post_delete, sender=Article)
+def uncount_article(sender, instance, **kwargs):
+    dashboard.bump(dashboard.ARTICLES, -1)
+    if instance.quantity <= instance.critical_threshold:
+        dashboard.bump(dashboard.CRITICAL_ARTICLES, -1)
+    DashboardCounter.objects.filter(
+        key=dashboard.article_orders_key(instance.pk)
+    ).delete()
+
+
+@receiver(post_save, sender=Article)
+def refresh_article_thumbnails(sender, instance, **kwargs):
+    # Ne régénère les miniatures que si l'image source a changé
+    if thumbnails.needs_renditions(instance):
+        thumbnails.schedule_renditions(instance)
+
+
+@receiver(post_delete, sender=Article)
+def delete_article_thumbnails(sender, instance, **kwargs):
+    stale_names = thumbnails.stale_rendition_names(instance)
+    if stale_names:
+        transaction.on_commit(lambda: thumbnails.delete_files(stale_names))
+
+
+@receiver(post_save, sender=Category)
+def count_category(sender, instance, created, **kwargs):
+    if created:
+        dashboard.bump(dashboard.CATEGORIES)
+
+
+@receiver(post_delete, sender=Category)
+def uncount_category(sender, instance, **kwargs):
+    dashboard.bump(dashboard.CATEGORIES, -1)
+
+
+# =============================================================================
+# INDEX DE RECHERCHE
+# =============================================================================
+
+@receiver(post_save, sender=Article)
+def index_article(sender, instance, created, **kwargs):
+    # Seuls le nom et la catégorie changent les mots indexés d'un article
+    previous = getattr(instance, "_previous_search_fields", None)
+    if created or previous != (instance.name, instance.category_id):
+        search.index_articles([instance.pk])
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_name(sender, instance, **kwargs):
+    instance._previous_name = (
+        Category.objects.filter(pk=instance.pk).values_list("name", flat=True).first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_articles(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_name", None)
+    if not created and previous is not None and previous != instance.name:
+        search.index_articles(instance.articles.values_list("id", flat=True))
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_articles(sender, instance, **kwargs):
+    # Les articles passent à category=NULL avant post_delete
+    instance._article_ids = list(instance.articles.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def reindex_uncategorized_articles(sender, instance, **kwargs):
+    search.index_articles(getattr(instance, "_article_ids", []))
+
+
+@receiver(post_save, sender=ArticleSupplier)
+@receiver(post_delete, sender=ArticleSupplier)
+def index_supplier_reference(sender, instance, **kwargs):
+    search.index_articles([instance.article_id])
+
+
+# =============================================================================
+# COMMANDES
+# =============================================================================
+
+@receiver(pre_save, sender=Order)
+def remember_order_status(sender, instance, **kwargs):
+    instance._previous_status = (
+        Order.objects.filter(pk=instance.pk).values_list("status", flat=True).first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Order)
+def count_order(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_status", None)
+    if created or previous is None:
+        dashboard.bump(dashboard.ORDERS)
+        dashboard.bump(dashboard.order_status_key(instance.status))
+    elif previous != instance.status:
+        dashboard.bump(dashboard.order_status_key(previous), -1)
+        dashboard.bump(dashboard.order_status_key(instance.status))
+
+
+@receiver(post_delete, sender=Order)
+def uncount_order(sender, instance, **kwargs):
+    dashboard.bump(dashboard.ORDERS, -1)
+    dashboard.bump(dashboard.order_status_key(instance.status), -1)
+
+
+@receiver(pre_save, sender=OrderItem)
+def remember_order_item_article(sender, instance, **kwargs):
+    instance._previous_article_id = (
+        OrderItem.objects.filter(pk=instance.pk)
+        .values_list("article_id", flat=True)
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=OrderItem)
+def count_order_item(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_article_id", None)
+    if created or previous is None:
+        dashboard.bump(dashboard.article_orders_key(instance.article_id))
+    elif previous != instance.article_id:
+        dashboard.bump(dashboard.article_orders_key(previous), -1)
+        dashboard.bump(dashboard.article_orders_key(instance.article_id))
+
+
+@receiver(post_delete, sender=OrderItem)
+def uncount_order_item(sender, instance, **kwargs):
+    dashboard.bump(dashboard.article_orders_key(instance.article_id), -1)
+
+
+# =============================================================================
+# FOURNISSEURS (APPARTENANCE AU GROUPE)
+# =============================================================================
+
+def _supplier_group_id():
+    return (
+        Group.objects.filter(name=dashboard.SUPPLIER_GROUP)
+        .values_list("id", flat=True)
+        .first()
+    )
+
+
+def _supplier_memberships(user_ids):
+    return User.groups.through.objects.filter(
+        user_id__in=user_ids, group__name=dashboard.SUPPLIER_GROUP
+    ).count()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def count_suppliers(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Suit les ajouts et retraits du groupe 'fournisseur', dans les deux sens
+    de la relation (user.groups et group.user_set).
+    """
+    if action in ("pre_remove", "pre_clear"):
+        # Mesurer les appartenances réelles avant leur suppression
+        if reverse:
+            if instance.name != dashboard.SUPPLIER_GROUP:
+                return
+            memberships = User.groups.through.objects.filter(group=instance)
+            if action == "pre_remove":
+                memberships = memberships.filter(user_id__in=pk_set)
+            instance._suppliers_removed = memberships.count()
+        else:
+            group_id = _supplier_group_id()
+            if action == "pre_remove" and group_id not in pk_set:
+                instance._suppliers_removed = 0
+                return
+            instance._suppliers_removed = _supplier_memberships([instance.pk])
+
+    elif action in ("post_remove", "post_clear"):
+        dashboard.bump(
+            dashboard.SUPPLIERS, -getattr(instance, "_suppliers_removed", 0)
+        )
+        instance._suppliers_removed = 0
+
+    elif action == "post_add":
+        if reverse:
+            if instance.name == dashboard.SUPPLIER_GROUP:
+                dashboard.bump(dashboard.SUPPLIERS, len(pk_set))
+        elif _supplier_group_id() in pk_set:
+            dashboard.bump(dashboard.SUPPLIERS)
+
+
+@receiver(pre_delete, sender=User)
+def uncount_supplier(sender, instance, **kwargs):
+    # Les lignes de user.groups sont supprimées en cascade, sans m2m_changed
+    if _supplier_memberships([instance.pk]):
+        dashboard.bump(dashboard.SUPPLIERS, -1)
+
+
+@receiver(pre_delete, sender=Group)
+def measure_supplier_group(sender, instance, **kwargs):
+    # Comme pour un utilisateur, les appartenances partent en cascade sans
+    # m2m_changed : elles sont comptées avant la suppression
+    if instance.name == dashboard.SUPPLIER_GROUP:
+        instance._suppliers_deleted = User.groups.through.objects.filter(
+            group=instance
+        ).count()
+
+
+@receiver(post_delete, sender=Group)
+def uncount_supplier_group(sender, instance, **kwargs):
+    dashboard.bump(dashboard.SUPPLIERS, -instance.__dict__.pop("_suppliers_deleted", 0))
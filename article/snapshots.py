@@ -0,0 +1,86 @@
+# snapshots.py
+"""
+Stock historique à partir d'instantanés périodiques.
+
+Le stock d'un article à une date donnée est la quantité du dernier
+instantané antérieur, augmentée des mouvements enregistrés depuis. Seule la
+portion du journal postérieure à l'instantané est donc lue.
+
+Le calcul suppose un journal complet : les modifications directes de
+``Article.quantity`` (création, correction) y sont inscrites par le signal
+``sync_default_stock_level``, et la migration 0015 a journalisé le stock
+existant.
+"""
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from .models import Article, StockMovement, StockSnapshot
+
+
+def take_snapshot(taken_at=None):
+    """
+    Enregistre la quantité courante de tous les articles.
+
+    Retourne ``(taken_at, nombre d'instantanés créés)``.
+    """
+    taken_at = taken_at or timezone.now()
+    with transaction.atomic():
+        snapshots = [
+            StockSnapshot(article_id=article_id, quantity=quantity, taken_at=taken_at)
+            for article_id, quantity in Article.objects.order_by("pk").values_list(
+                "id", "quantity"
+            )
+        ]
+        StockSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+    return taken_at, len(snapshots)
+
+
+def stock_at(before, article_ids=None):
+    """
+    Stock des articles juste avant l'instant ``before``.
+
+    Deux requêtes agrégées au plus : la lecture de l'instantané le plus
+    proche et la somme des entrées/sorties depuis celui-ci. Sans instantané
+    antérieur, tout le journal précédant ``before`` est rejoué à partir de 0
+    (la quantité de création y figure).
+    Retourne ``(date de l'instantané ou None, {article_id: quantité})``.
+    """
+    taken_at = (
+        StockSnapshot.objects.filter(taken_at__lt=before)
+        .order_by("-taken_at")
+        .values_list("taken_at", flat=True)
+        .first()
+    )
+
+    movements = StockMovement.objects.filter(created_at__lt=before)
+    if article_ids is not None:
+        movements = movements.filter(article_id__in=article_ids)
+
+    stock = {}
+    if taken_at is not None:
+        snapshots = StockSnapshot.objects.filter(taken_at=taken_at)
+        if article_ids is not None:
+            snapshots = snapshots.filter(article_id__in=article_ids)
+        stock.update(snapshots.values_list("article_id", "quantity"))
+        movements = movements.filter(created_at__gte=taken_at)
+
+    # Deux sommes positives plutôt qu'une somme signée : les colonnes
+    # non signées de MySQL refusent les valeurs négatives intermédiaires.
+    rows = (
+        movements.order_by()
+        .values("article_id")
+        .annotate(
+            inflow=Sum(
+                "quantity", filter=Q(movement_type__in=StockMovement.INFLOW_TYPES)
+            ),
+            outflow=Sum(
+                "quantity", filter=Q(movement_type__in=StockMovement.OUTFLOW_TYPES)
+            ),
+        )
+    )
+    for row in rows:
+        stock[row["article_id"]] = (
+            stock.get(row["article_id"], 0) + (row["inflow"] or 0) - (row["outflow"] or 0)
+        )
+    return taken_at, stock
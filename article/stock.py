@@ -0,0 +1,272 @@
+# stock.py
+"""
+Opérations de stock partagées par les chemins d'écriture en masse.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Article, Order, OrderItem, StockLevel, StockMovement, Warehouse
+from .signals import stock_changed
+from .transitions import DELIVERED_STATUS
+
+
+# Nombre maximal de mouvements acceptés dans un seul lot
+BULK_MOVEMENTS_MAX = 1000
+
+
+def _movement_levels(movement_type, quantity, source_id, destination_id):
+    """Variations ``[(warehouse_id, delta)]`` des niveaux touchés par un mouvement"""
+    if movement_type == "transfer":
+        return [(source_id, -quantity), (destination_id, quantity)]
+    delta = StockMovement.signed_quantity(movement_type, quantity)
+    if not delta:
+        return []
+    return [(destination_id if delta > 0 else source_id, delta)]
+
+
+def ingest_movements(items, user):
+    """
+    Applique un lot de mouvements déjà validés dans une seule transaction.
+
+    Les niveaux d'entrepôt concernés, puis les articles dont le total
+    change (les transferts ne le modifient pas), sont verrouillés une seule
+    fois ; leurs valeurs finales sont écrites en une requête UPDATE chacune
+    et les mouvements sont insérés avec ``bulk_create``. Retourne
+    ``(mouvements, erreurs)`` : si la liste d'erreurs n'est pas vide, aucune
+    écriture n'est effectuée.
+    """
+    article_ids = {item["article"] for item in items}
+    warehouse_ids = {
+        item[field]
+        for item in items
+        for field in ("source_warehouse", "destination_warehouse")
+        if item.get(field)
+    }
+    existing_articles = set(
+        Article.objects.filter(pk__in=article_ids).values_list("pk", flat=True)
+    )
+    existing_warehouses = set(
+        Warehouse.objects.filter(pk__in=warehouse_ids).values_list("pk", flat=True)
+    )
+    default_id = Warehouse.objects.default_id()
+
+    errors = []
+    movements = []
+    for index, item in enumerate(items):
+        item_errors = {}
+        if item["article"] not in existing_articles:
+            item_errors["article"] = ["Article introuvable."]
+        for field in ("source_warehouse", "destination_warehouse"):
+            if item.get(field) and item[field] not in existing_warehouses:
+                item_errors[field] = ["Entrepôt introuvable."]
+        if item_errors:
+            errors.append({"index": index, "errors": item_errors})
+            continue
+        movement = StockMovement(
+            article_id=item["article"],
+            movement_type=item["movement_type"],
+            quantity=item["quantity"],
+            reference_document=item.get("reference_document", ""),
+            source_warehouse_id=item.get("source_warehouse"),
+            destination_warehouse_id=item.get("destination_warehouse"),
+            user=user,
+        )
+        movement.resolve_warehouses(default_id)
+        movements.append((index, movement))
+    if errors:
+        return [], errors
+
+    pairs = sorted(
+        {
+            (movement.article_id, warehouse_id)
+            for _, movement in movements
+            for warehouse_id, _ in _movement_levels(
+                movement.movement_type,
+                movement.quantity,
+                movement.source_warehouse_id,
+                movement.destination_warehouse_id,
+            )
+        }
+    )
+    totals_changed = sorted(
+        {
+            movement.article_id
+            for _, movement in movements
+            if StockMovement.signed_quantity(movement.movement_type, movement.quantity)
+        }
+    )
+
+    with transaction.atomic():
+        StockLevel.objects.ensure(pairs)
+        # Verrouillage dans l'ordre des clés (niveaux puis articles, comme
+        # StockMovement.save) pour éviter les interblocages
+        level_filter = Q()
+        for article_id, warehouse_id in pairs:
+            level_filter |= Q(article_id=article_id, warehouse_id=warehouse_id)
+        levels = {
+            (level.article_id, level.warehouse_id): level
+            for level in StockLevel.objects.select_for_update()
+            .filter(level_filter)
+            .order_by("article_id", "warehouse_id")
+        }
+        articles = {
+            article.pk: article
+            for article in Article.objects.select_for_update()
+            .filter(pk__in=totals_changed)
+            .only("id", "quantity", "critical_threshold", "is_critical")
+            .order_by("pk")
+        }
+        running_levels = {key: level.quantity for key, level in levels.items()}
+        running = {pk: article.quantity for pk, article in articles.items()}
+
+        for index, movement in movements:
+            changes = _movement_levels(
+                movement.movement_type,
+                movement.quantity,
+                movement.source_warehouse_id,
+                movement.destination_warehouse_id,
+            )
+            if any(
+                running_levels[(movement.article_id, warehouse_id)] + delta < 0
+                for warehouse_id, delta in changes
+            ):
+                errors.append(
+                    {
+                        "index": index,
+                        "errors": {"quantity": ["Quantité insuffisante en stock"]},
+                    }
+                )
+                continue
+            for warehouse_id, delta in changes:
+                running_levels[(movement.article_id, warehouse_id)] += delta
+            if movement.article_id in running:
+                running[movement.article_id] += StockMovement.signed_quantity(
+                    movement.movement_type, movement.quantity
+                )
+
+        if errors:
+            # Les niveaux créés à zéro par ensure() sont annulés avec le reste
+            transaction.set_rollback(True)
+            return [], errors
+
+        # Les lignes sont verrouillées : on écrit directement les valeurs finales
+        now = timezone.now()
+        for key, quantity in running_levels.items():
+            if quantity != levels[key].quantity:
+                StockLevel.objects.filter(pk=levels[key].pk).update(
+                    quantity=quantity, updated_at=now
+                )
+        for pk, quantity in running.items():
+            article = articles[pk]
+            if quantity != article.quantity:
+                Article.objects.filter(pk=pk).update(quantity=quantity, updated_at=now)
+                stock_changed.send(
+                    sender=Article,
+                    article_id=pk,
+                    quantity=quantity,
+                    critical_threshold=article.critical_threshold,
+                    was_critical=article.is_critical,
+                )
+
+        movements = [movement for _, movement in movements]
+        StockMovement.objects.bulk_create(movements, batch_size=500)
+
+    return movements, errors
+
+
+def receive_order(order_id, lines, user, warehouse_id=None):
+    """
+    Enregistre la réception de lignes d'une commande, en une transaction.
+
+    ``lines`` est une liste ``[(order_item_id, quantité reçue cumulée)]`` :
+    seul l'écart avec la quantité déjà reçue entre en stock (une entrée par
+    ligne, via ``ingest_movements``), de sorte qu'un envoi répété ne gonfle
+    pas le stock. Quand toutes les lignes sont reçues, la commande passe au
+    statut livré avec sa date de livraison.
+
+    Seule une commande qui peut encore passer au statut livré (voir
+    ``Order.TRANSITIONS``) est réceptionnée : une commande annulée ou déjà
+    livrée est refusée sans rien écrire. Retourne ``(commande, mouvements,
+    erreurs)`` ; en cas d'erreur, rien n'est écrit.
+    Lève ``Order.DoesNotExist`` si la commande n'existe pas.
+    """
+    with transaction.atomic():
+        order = Order.objects.select_for_update().get(pk=order_id)
+        if not Order.can_transition(order.status, DELIVERED_STATUS):
+            return order, [], [
+                {
+                    "index": None,
+                    "errors": {
+                        "status": [
+                            "Une commande au statut "
+                            f"« {order.get_status_display()} » ne peut pas être réceptionnée"
+                        ]
+                    },
+                }
+            ]
+        items = {
+            item.pk: item
+            for item in OrderItem.objects.select_for_update()
+            .filter(order=order)
+            .order_by("pk")
+        }
+
+        errors = []
+        seen = set()
+        received = []
+        for index, (item_id, quantity_received) in enumerate(lines):
+            item = items.get(item_id)
+            if item is None:
+                message = "Ligne introuvable dans cette commande."
+            elif item_id in seen:
+                message = "Ligne présente plusieurs fois."
+            elif quantity_received > item.quantity_ordered:
+                message = "La quantité reçue ne peut dépasser la quantité commandée"
+            elif quantity_received < item.quantity_received:
+                message = (
+                    f"La quantité reçue ne peut diminuer (déjà reçu : {item.quantity_received})"
+                )
+            else:
+                message = None
+            if message:
+                errors.append({"index": index, "errors": {"quantity_received": [message]}})
+                continue
+            seen.add(item_id)
+            if quantity_received != item.quantity_received:
+                received.append((index, item, quantity_received - item.quantity_received))
+                item.quantity_received = quantity_received
+        if errors:
+            return order, [], errors
+
+        movements = []
+        if received:
+            movements, movement_errors = ingest_movements(
+                [
+                    {
+                        "article": item.article_id,
+                        "movement_type": "in",
+                        "quantity": delta,
+                        "reference_document": order.order_number,
+                        "destination_warehouse": warehouse_id,
+                    }
+                    for _, item, delta in received
+                ],
+                user,
+            )
+            if movement_errors:
+                transaction.set_rollback(True)
+                return order, [], [
+                    {"index": received[error["index"]][0], "errors": error["errors"]}
+                    for error in movement_errors
+                ]
+            OrderItem.objects.bulk_update(
+                [item for _, item, _ in received], ["quantity_received"]
+            )
+
+        if items and all(item.is_fully_received for item in items.values()):
+            order.status = DELIVERED_STATUS
+            order.actual_delivery_date = timezone.localdate()
+            order.save(update_fields=["status", "actual_delivery_date", "updated_at"])
+
+    return order, movements, errors
@@ -1,3 +1,640 @@
-from django.test import TestCase
+import threading
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.db import close_old_connections, connection
+from django.utils import timezone
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase, APITransactionTestCase
+
+from config.dbpool import run_in_pool
+from config.testing import QueryBudgetTestMixin
+
+from . import dashboard, reorder, snapshots, transitions
+from .models import (
+    Article,
+    ArticleSupplier,
+    Category,
+    Order,
+    OrderItem,
+    StockLevel,
+    StockMovement,
+)
+from .pagination import CreatedAtCursorPagination
+from .stock import BULK_MOVEMENTS_MAX
+from .views import OrderListCreateView
+
+
+class ConcurrentStockDecrementTests(TransactionTestCase):
+    """
+    Sorties simultanées sur le même article : l'UPDATE conditionnel de
+    ``StockMovement.save`` ne doit ni perdre de mise à jour ni survendre.
+    """
+
+    THREADS = 8
+    ATTEMPTS_PER_THREAD = 10
+    INITIAL_QUANTITY = 50
+
+    def test_concurrent_decrements_never_oversell(self):
+        # Vérifié ici, sur la base de test (la base SQLite de test est en mémoire)
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("Base SQLite en mémoire : pas d'écritures concurrentes")
+        article = Article.objects.create(
+            name="Stress", unit_price=1, quantity=self.INITIAL_QUANTITY
+        )
+        barrier = threading.Barrier(self.THREADS)
+        succeeded = []
+        refused = []
+        errors = []
+
+        def worker():
+            try:
+                barrier.wait()
+                for _ in range(self.ATTEMPTS_PER_THREAD):
+                    try:
+                        StockMovement.objects.create(
+                            article_id=article.pk, movement_type="out", quantity=1
+                        )
+                    except ValueError:
+                        refused.append(1)
+                    else:
+                        succeeded.append(1)
+                    current = Article.objects.values_list("quantity", flat=True).get(
+                        pk=article.pk
+                    )
+                    if current < 0:
+                        errors.append(f"quantité négative : {current}")
+            except Exception as exc:  # remonté au thread principal
+                errors.append(repr(exc))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        article.refresh_from_db()
+        self.assertGreaterEqual(article.quantity, 0)
+        self.assertEqual(len(succeeded) + article.quantity, self.INITIAL_QUANTITY)
+        self.assertEqual(
+            len(succeeded) + len(refused), self.THREADS * self.ATTEMPTS_PER_THREAD
+        )
+        self.assertEqual(
+            StockMovement.objects.filter(article=article, movement_type="out").count(),
+            len(succeeded),
+        )
+        self.assertEqual(article.stock_levels.get().quantity, article.quantity)
+
+
+class CursorOrderingTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "x")
+        self.client.force_authenticate(self.user)
+        # Montants ex aequo : seul l'id départage les commandes
+        self.ids = [
+            Order.objects.create(
+                order_number=f"PO-{n}", supplier=self.user, total_amount=n % 2
+            ).pk
+            for n in range(7)
+        ]
+
+    def test_pages_on_non_unique_ordering_neither_skip_nor_repeat(self):
+        for ordering in ("total_amount", "-total_amount"):
+            with self.subTest(ordering=ordering):
+                seen = []
+                url = f"/api/orders/?ordering={ordering}&page_size=2"
+                while url:
+                    data = self.client.get(url).json()
+                    seen += [order["id"] for order in data["results"]]
+                    url = data["next"]
+                self.assertEqual(sorted(seen), sorted(self.ids))
+
+    def test_user_ordering_gets_id_tiebreak(self):
+        view = OrderListCreateView()
+        for ordering, expected in (
+            ("total_amount", ("total_amount", "id")),
+            ("-total_amount", ("-total_amount", "id")),
+            ("", ("-created_at", "id")),
+        ):
+            with self.subTest(ordering=ordering):
+                request = Request(APIRequestFactory().get("/", {"ordering": ordering}))
+                self.assertEqual(
+                    CreatedAtCursorPagination().get_ordering(
+                        request, Order.objects.all(), view
+                    ),
+                    expected,
+                )
+
+
+class OrderNumberTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "x")
+        self.client.force_authenticate(self.user)
+        self.article = Article.objects.create(name="Vis", unit_price=1)
+
+    def order_payload(self):
+        return {
+            "supplier": self.user.pk,
+            "order_items": [
+                {"article": self.article.pk, "quantity_ordered": 1, "unit_price": "1.00"}
+            ],
+        }
+
+    def test_orders_created_in_the_same_second_get_distinct_numbers(self):
+        for _ in range(3):
+            response = self.client.post("/api/orders/", self.order_payload(), format="json")
+            self.assertEqual(response.status_code, 201)
+        for _ in range(2):
+            response = self.client.post(
+                "/api/orders/bulk/", [self.order_payload()] * 3, format="json"
+            )
+            self.assertEqual(response.status_code, 201)
+        numbers = Order.objects.values_list("order_number", flat=True)
+        self.assertEqual(len(set(numbers)), 9)
+
+
+class StockAtTests(TransactionTestCase):
+    """
+    Le stock historique doit inclure la quantité de création et les
+    modifications directes de ``Article.quantity``, qui ne passent pas par
+    ``StockMovement.save``.
+    """
+
+    def move(self, article, movement_type, quantity):
+        StockMovement.objects.create(
+            article=article, movement_type=movement_type, quantity=quantity
+        )
+
+    def test_without_snapshot(self):
+        article = Article.objects.create(name="Vis", unit_price=1, quantity=10)
+        self.move(article, "out", 4)
+        middle = timezone.now()
+        article.refresh_from_db()
+        article.quantity = 20  # correction directe : +14
+        article.save()
+        self.move(article, "out", 13)
+
+        taken_at, stock = snapshots.stock_at(middle, [article.pk])
+        self.assertIsNone(taken_at)
+        self.assertEqual(stock[article.pk], 6)
+        taken_at, stock = snapshots.stock_at(timezone.now(), [article.pk])
+        self.assertEqual(stock[article.pk], 7)
+        article.refresh_from_db()
+        self.assertEqual(article.quantity, 7)
+
+    def test_after_snapshot(self):
+        article = Article.objects.create(name="Vis", unit_price=1, quantity=10)
+        snapshot_taken_at, _ = snapshots.take_snapshot()
+        article.refresh_from_db()
+        article.quantity = 7  # correction directe : -3
+        article.save()
+        self.move(article, "in", 5)
+        middle = timezone.now()
+        self.move(article, "out", 2)
+
+        taken_at, stock = snapshots.stock_at(middle, [article.pk])
+        self.assertEqual(taken_at, snapshot_taken_at)
+        self.assertEqual(stock[article.pk], 12)
+        taken_at, stock = snapshots.stock_at(timezone.now(), [article.pk])
+        self.assertEqual(stock[article.pk], 10)
+        article.refresh_from_db()
+        self.assertEqual(article.quantity, 10)
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, APITransactionTestCase):
+    """
+    Budgets de requêtes SQL : toutes les routes GET, et la création de
+    commande, dont le coût ne doit pas dépendre du nombre de lignes.
+    """
+
+    reset_sequences = True
+    default_budget = 8
+    ORDER_CREATE_BUDGET = 16
+
+    def setUp(self):
+        self.user = self.authenticate()
+        category = Category.objects.create(name="Quincaillerie")
+        self.articles = [
+            Article.objects.create(
+                name=f"Article {n}", category=category, unit_price=1, quantity=n
+            )
+            for n in range(1, 201)
+        ]
+        ArticleSupplier.objects.create(
+            article=self.articles[0], supplier=self.user, supplier_price=2
+        )
+        for article in self.articles[:3]:
+            StockMovement.objects.create(article=article, movement_type="out", quantity=1)
+        self.post_order(5)
+
+    def post_order(self, lines):
+        return self.client.post(
+            "/api/orders/",
+            {
+                "supplier": self.user.pk,
+                "order_items": [
+                    {"article": article.pk, "quantity_ordered": 1, "unit_price": "1.00"}
+                    for article in self.articles[:lines]
+                ],
+            },
+            format="json",
+        )
+
+    def test_order_create_query_count_does_not_grow_with_lines(self):
+        for lines in (10, 200):
+            with self.subTest(lines=lines):
+                with self.assertMaxQueries(
+                    self.ORDER_CREATE_BUDGET, f"POST /api/orders/ ({lines} lignes)"
+                ):
+                    response = self.post_order(lines)
+                self.assertEqual(response.status_code, 201)
+
+    def test_order_list_and_dashboard(self):
+        self.post_order(50)
+        for path, budget in (("/api/orders/", 6), ("/api/dashboard/stats/", 4)):
+            with self.subTest(path=path):
+                response = self.assertQueryBudget(path, budget)
+                self.assertEqual(response.status_code, 200)
+
+
+class OrderReceiptTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "x")
+        self.user.groups.add(Group.objects.get_or_create(name="gestionnaire")[0])
+        self.client.force_authenticate(self.user)
+        self.article = Article.objects.create(name="Vis", unit_price=1, quantity=5)
+
+    def order(self, status):
+        order = Order.objects.create(
+            order_number=f"PO-{status}", supplier=self.user, status=status
+        )
+        item = OrderItem.objects.create(
+            order=order, article=self.article, quantity_ordered=4, unit_price=1
+        )
+        return order, item
+
+    def receive(self, order, item):
+        return self.client.post(
+            f"/api/orders/{order.pk}/receive/",
+            {"items": [{"order_item": item.pk, "quantity_received": 4}]},
+            format="json",
+        )
+
+    def test_cancelled_or_delivered_order_is_rejected(self):
+        for order_status in ("cancelled", "delivered"):
+            with self.subTest(status=order_status):
+                order, item = self.order(order_status)
+                response = self.receive(order, item)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("status", response.json()["errors"][0]["errors"])
+                self.article.refresh_from_db()
+                self.assertEqual(self.article.quantity, 5)
+                item.refresh_from_db()
+                self.assertEqual(item.quantity_received, 0)
+                self.assertFalse(
+                    StockMovement.objects.filter(reference_document=order.order_number).exists()
+                )
+
+    def test_open_order_is_received_and_delivered(self):
+        order, item = self.order("shipped")
+        response = self.receive(order, item)
+        self.assertEqual(response.status_code, 200)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.quantity, 9)
+        order.refresh_from_db()
+        self.assertEqual(order.status, "delivered")
+
+
+class BulkMovementTests(APITestCase):
+    URL = "/api/stock-movements/bulk/"
+
+    def setUp(self):
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "x")
+        self.user.groups.add(Group.objects.get_or_create(name="gestionnaire")[0])
+        self.client.force_authenticate(self.user)
+        self.vis = Article.objects.create(name="Vis", unit_price=1, quantity=10)
+        self.ecrou = Article.objects.create(name="Écrou", unit_price=1, quantity=3)
+
+    def line(self, article, movement_type, quantity):
+        return {"article": article.pk, "movement_type": movement_type, "quantity": quantity}
+
+    def assertStock(self, article, quantity):
+        article.refresh_from_db()
+        self.assertEqual(article.quantity, quantity)
+        self.assertEqual(article.stock_levels.get().quantity, quantity)
+
+    def test_batch_is_applied_in_order(self):
+        response = self.client.post(
+            self.URL,
+            [
+                self.line(self.vis, "out", 4),
+                self.line(self.ecrou, "in", 5),
+                self.line(self.vis, "out", 6),
+                self.line(self.ecrou, "out", 8),
+            ],
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {"created": 4})
+        self.assertStock(self.vis, 0)
+        self.assertStock(self.ecrou, 0)
+        self.assertEqual(StockMovement.objects.filter(user=self.user).count(), 4)
+
+    def test_insufficient_line_rejects_the_whole_batch(self):
+        response = self.client.post(
+            self.URL,
+            [self.line(self.ecrou, "in", 1), self.line(self.vis, "out", 11)],
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"][0]["index"], 1)
+        self.assertStock(self.vis, 10)
+        self.assertStock(self.ecrou, 3)
+        self.assertFalse(StockMovement.objects.filter(user=self.user).exists())
+
+    def test_unknown_article_and_invalid_lines_are_reported_by_index(self):
+        missing = {"article": 0, "movement_type": "in", "quantity": 1}
+        response = self.client.post(
+            self.URL, [self.line(self.vis, "in", 1), missing], format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["errors"],
+            [{"index": 1, "errors": {"article": ["Article introuvable."]}}],
+        )
+        response = self.client.post(
+            self.URL, [self.line(self.vis, "in", 0)], format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("quantity", response.json()["errors"][0]["errors"])
+        self.assertStock(self.vis, 10)
+
+    def test_batch_size_is_capped(self):
+        lines = [self.line(self.vis, "in", 1)] * (BULK_MOVEMENTS_MAX + 1)
+        response = self.client.post(self.URL, lines, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertStock(self.vis, 10)
+
+
+class SupplierCounterTests(APITestCase):
+    def test_deleting_the_supplier_group_keeps_the_counter_exact(self):
+        group = Group.objects.get_or_create(name=dashboard.SUPPLIER_GROUP)[0]
+        for name in ("alice", "bob"):
+            User.objects.create_user(name, password="x").groups.add(group)
+        User.objects.create_user("carol", password="x")
+        self.assertEqual(dashboard.read_counters()[dashboard.SUPPLIERS], 2)
+
+        group.delete()
+        self.assertEqual(dashboard.check(), [])
+        self.assertEqual(dashboard.read_counters()[dashboard.SUPPLIERS], 0)
+
+
+class JournalMovementTests(APITestCase):
+    """
+    Les écritures de journal (création, correction directe) ne sont pas des
+    consommations : elles n'entrent ni dans le réapprovisionnement ni dans
+    les séries temporelles.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "x")
+        self.client.force_authenticate(self.user)
+        self.article = Article.objects.create(name="Vis", unit_price=1, quantity=10)
+        self.article.quantity = 4  # correction directe : -6
+        self.article.save()
+        StockMovement.objects.create(article=self.article, movement_type="out", quantity=2)
+
+    def test_consumption_ignores_journal_movements(self):
+        self.assertEqual(
+            StockMovement.objects.filter(
+                reference_document__in=StockMovement.JOURNAL_REFERENCES
+            ).count(),
+            2,
+        )
+        self.assertEqual(reorder.consumption_by_article(30), {self.article.pk: 2})
+
+    def test_timeseries_ignores_journal_movements(self):
+        response = self.client.get("/api/stock-movements/timeseries/?bucket=day")
+        self.assertEqual(response.status_code, 200)
+        [row] = response.json()
+        self.assertEqual(
+            {movement_type: row[movement_type] for movement_type in ("in", "out", "adjustment")},
+            {"in": 0, "out": 2, "adjustment": 0},
+        )
+
+
+class PoolConnectionTests(TransactionTestCase):
+    def test_pool_connection_outlives_conn_max_age_zero(self):
+        def probe():
+            # CONN_MAX_AGE de l'ASGI : les connexions des requêtes sont fermées
+            max_age = connection.settings_dict["CONN_MAX_AGE"]
+            connection.settings_dict["CONN_MAX_AGE"] = 0
+            try:
+                connection.close()
+                connection.ensure_connection()
+            finally:
+                connection.settings_dict["CONN_MAX_AGE"] = max_age
+            close_old_connections()  # comme en fin de tâche
+            return connection.connection is not None
+
+        self.assertTrue(async_to_sync(run_in_pool)(probe))
+
+
+class ArticleLockOrderTests(TransactionTestCase):
+    """
+    Une correction directe de la quantité verrouille le niveau de l'entrepôt
+    par défaut avant d'écrire l'article, comme ``StockMovement.save``.
+    """
+
+    def table(self, model):
+        return connection.ops.quote_name(model._meta.db_table)
+
+    def test_default_level_is_locked_before_the_article_update(self):
+        article = Article.objects.create(name="Vis", unit_price=1, quantity=10)
+        for quantity in (4, 12):
+            with self.subTest(quantity=quantity):
+                article.refresh_from_db()
+                article.quantity = quantity
+                with CaptureQueriesContext(connection) as queries:
+                    article.save()
+                statements = [query["sql"] for query in queries]
+                level_read = next(
+                    n for n, sql in enumerate(statements)
+                    if sql.startswith("SELECT") and self.table(StockLevel) in sql
+                )
+                article_update = next(
+                    n for n, sql in enumerate(statements)
+                    if sql.startswith(f"UPDATE {self.table(Article)}")
+                )
+                self.assertLess(level_read, article_update)
+                if connection.features.has_select_for_update:
+                    self.assertIn("FOR UPDATE", statements[level_read])
+        self.assertEqual(article.stock_levels.get().quantity, 12)
+
+
+class OrderStatusTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "x")
+        self.client.force_authenticate(self.user)
+        self.article = Article.objects.create(name="Vis", unit_price=1)
+
+    def order(self, order_status, number):
+        return Order.objects.create(
+            order_number=f"PO-{number}", supplier=self.user, status=order_status
+        )
+
+    def statuses(self, *orders):
+        return [Order.objects.get(pk=order.pk).status for order in orders]
+
+    def test_status_is_read_only_on_the_order_serializer(self):
+        response = self.client.post(
+            "/api/orders/",
+            {
+                "supplier": self.user.pk,
+                "status": "delivered",
+                "order_items": [
+                    {"article": self.article.pk, "quantity_ordered": 1, "unit_price": "1.00"}
+                ],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["status"], "pending")
+
+        order = self.order("cancelled", 1)
+        response = self.client.patch(
+            f"/api/orders/{order.pk}/", {"status": "pending"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.statuses(order), ["cancelled"])
+
+    def test_forbidden_transitions_are_rejected(self):
+        for current, target in (
+            ("pending", "shipped"),
+            ("shipped", "cancelled"),
+            ("cancelled", "pending"),
+            ("delivered", "confirmed"),
+        ):
+            with self.subTest(current=current, target=target):
+                order = self.order(current, f"{current}-{target}")
+                response = self.client.patch(
+                    f"/api/orders/{order.pk}/status/", {"status": target}, format="json"
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertNotIn("delivered", response.json()["allowed"])
+                self.assertEqual(self.statuses(order), [current])
+
+    def test_delivered_is_only_set_by_receipt(self):
+        order = self.order("confirmed", 1)
+        response = self.client.patch(
+            f"/api/orders/{order.pk}/status/", {"status": "delivered"}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            "/api/orders/bulk-status/", {"ids": [order.pk], "status": "delivered"}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.statuses(order), ["confirmed"])
+        with self.assertRaises(ValueError):
+            transitions.transition_orders([order.pk], "delivered")
+
+    def test_bulk_status_moves_allowed_orders_and_reports_the_rest(self):
+        pending = self.order("pending", 1)
+        confirmed = self.order("confirmed", 2)
+        cancelled = self.order("cancelled", 3)
+        response = self.client.post(
+            "/api/orders/bulk-status/",
+            {"ids": [pending.pk, confirmed.pk, cancelled.pk, 0], "status": "cancelled"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["moved"], [pending.pk, confirmed.pk])
+        self.assertEqual(
+            [(rejected["id"], rejected["status"]) for rejected in data["rejected"]],
+            [(cancelled.pk, "cancelled"), (0, None)],
+        )
+        self.assertEqual(self.statuses(pending, confirmed, cancelled), ["cancelled"] * 3)
+        self.assertEqual(dashboard.check(), [])
+
+
+class SupplierMatrixTests(APITestCase):
+    URL = "/api/articles/supplier-matrix/"
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "x")
+        self.client.force_authenticate(self.user)
+        self.suppliers = [
+            User.objects.create_user(f"fournisseur{n}", password="x") for n in range(4)
+        ]
+        # Nombre impair de fournisseurs : médiane = prix du milieu
+        self.odd = self.article("A impair", ["3.00", "1.00", "2.00"], preferred=0)
+        # Nombre pair : médiane = moyenne des deux prix du milieu
+        self.even = self.article("B pair", ["10.00", "40.00", "20.00", "35.00"])
+        Article.objects.create(name="C sans fournisseur", unit_price=1)
+
+    def article(self, name, prices, preferred=None):
+        article = Article.objects.create(name=name, unit_price=1)
+        for n, price in enumerate(prices):
+            ArticleSupplier.objects.create(
+                article=article,
+                supplier=self.suppliers[n],
+                supplier_price=price,
+                is_preferred=n == preferred,
+            )
+        return article
+
+    def page(self, number):
+        response = self.client.get(f"{self.URL}?page={number}&page_size=1")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_odd_and_even_medians_across_pages(self):
+        first, second = self.page(1), self.page(2)
+        self.assertEqual(first["count"], 2)
+        self.assertIsNotNone(first["next"])
+        self.assertIsNone(second["next"])
+
+        [odd] = first["results"]
+        self.assertEqual(odd["id"], self.odd.pk)
+        self.assertEqual(odd["supplier_count"], 3)
+        self.assertEqual(
+            (odd["min_price"], odd["median_price"], odd["max_price"]),
+            (1, 2, 3),
+        )
+        self.assertEqual(odd["cheapest_supplier"]["id"], self.suppliers[1].pk)
+        self.assertEqual(odd["preferred_supplier"]["id"], self.suppliers[0].pk)
+
+        [even] = second["results"]
+        self.assertEqual(even["id"], self.even.pk)
+        self.assertEqual(even["supplier_count"], 4)
+        self.assertEqual(
+            (even["min_price"], even["median_price"], even["max_price"]),
+            (10, 27.5, 40),
+        )
+        self.assertIsNone(even["preferred_supplier"])
+
+    def test_pages_are_cached_per_url(self):
+        self.assertEqual(self.page(1)["results"][0]["median_price"], 2)
+        ArticleSupplier.objects.filter(article=self.odd, supplier_price=2).update(
+            supplier_price="2.50"
+        )
+        self.assertEqual(self.page(1)["results"][0]["median_price"], 2)
+        response = self.client.get(f"{self.URL}?page_size=1")
+        self.assertEqual(response.json()["results"][0]["median_price"], 2.5)
+
+    @override_settings(SUPPLIER_MATRIX_CACHE_SECONDS=0)
+    def test_cache_can_be_disabled(self):
+        self.page(1)
+        ArticleSupplier.objects.filter(article=self.odd, supplier_price=2).update(
+            supplier_price="2.50"
+        )
+        self.assertEqual(self.page(1)["results"][0]["median_price"], 2.5)
@@ -0,0 +1,135 @@
+# thumbnails.py
+"""
+Miniatures de l'image des articles.
+
+Les miniatures sont générées hors de la requête d'envoi, dans un pool de
+threads, après la validation de la transaction. Le champ
+``Article.image_renditions`` mémorise l'image source dont elles proviennent :
+elles ne sont régénérées que lorsque cette source change.
+"""
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import Article
+
+
+logger = logging.getLogger(__name__)
+
+# Côté le plus long des miniatures, en pixels
+RENDITION_SIZES = (64, 256, 1024)
+RENDITION_FORMAT = "WEBP"
+RENDITION_EXTENSION = "webp"
+RENDITION_QUALITY = 80
+RENDITIONS_DIR = "uploads/articles/renditions/"
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="thumbnails")
+
+
+def rendition_name(source_name, size):
+    stem = posixpath.splitext(posixpath.basename(source_name))[0]
+    return f"{RENDITIONS_DIR}{stem}_{size}.{RENDITION_EXTENSION}"
+
+
+def is_current(article):
+    """
+    Indique si les miniatures enregistrées correspondent à l'image actuelle.
+    """
+    renditions = article.image_renditions or {}
+    return bool(article.image) and renditions.get("source") == article.image.name
+
+
+def needs_renditions(article):
+    renditions = article.image_renditions or {}
+    return renditions.get("source") != (article.image.name or None)
+
+
+def stale_rendition_names(article):
+    return list((article.image_renditions or {}).get("sizes", {}).values())
+
+
+def delete_files(names):
+    for name in names:
+        if name and default_storage.exists(name):
+            default_storage.delete(name)
+
+
+def generate_renditions(article_id, source_name, stale_names=()):
+    """
+    Génère les miniatures de ``source_name`` puis les enregistre sur
+    l'article, seulement si son image n'a pas changé entre-temps.
+    """
+    delete_files(stale_names)
+    if not source_name:
+        Article.objects.filter(pk=article_id, image__in=["", None]).update(
+            image_renditions={}, updated_at=timezone.now()
+        )
+        return {}
+
+    with default_storage.open(source_name) as source:
+        image = Image.open(source)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    sizes = {}
+    for size in RENDITION_SIZES:
+        rendition = image.copy()
+        rendition.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        rendition.save(buffer, RENDITION_FORMAT, quality=RENDITION_QUALITY)
+        name = rendition_name(source_name, size)
+        delete_files([name])
+        sizes[str(size)] = default_storage.save(name, ContentFile(buffer.getvalue()))
+
+    renditions = {"source": source_name, "sizes": sizes}
+    if not Article.objects.filter(pk=article_id, image=source_name).update(
+        image_renditions=renditions, updated_at=timezone.now()
+    ):
+        # L'image a été remplacée pendant la génération
+        delete_files(sizes.values())
+    return renditions
+
+
+def _run(article_id, source_name, stale_names):
+    try:
+        generate_renditions(article_id, source_name, stale_names)
+    except Exception:
+        logger.exception("Échec de la génération des miniatures de l'article %s", article_id)
+    finally:
+        # Le thread ouvre ses propres connexions : on les referme
+        connections.close_all()
+
+
+def schedule_renditions(article):
+    """
+    Planifie la (re)génération des miniatures après la validation de la
+    transaction courante.
+    """
+    stale_names = stale_rendition_names(article)
+    source_name = article.image.name or None
+    transaction.on_commit(
+        lambda: _executor.submit(_run, article.pk, source_name, stale_names)
+    )
+
+
+def rendition_urls(article, request=None):
+    """
+    URLs des miniatures de l'article, par taille ; vide tant qu'elles ne
+    correspondent pas à l'image actuelle.
+    """
+    if not is_current(article):
+        return {}
+    urls = {}
+    for size, name in article.image_renditions.get("sizes", {}).items():
+        url = default_storage.url(name)
+        urls[size] = request.build_absolute_uri(url) if request is not None else url
+    return urls
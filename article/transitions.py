@@ -0,0 +1,91 @@
+# transitions.py
+"""
+Changements de statut des commandes, un à un ou en masse.
+
+Les transitions autorisées sont définies par ``Order.TRANSITIONS``. Un lot
+de commandes change de statut par un seul
+``UPDATE ... WHERE id IN (...) AND status IN (statuts autorisés)``, après
+verrouillage des lignes pour savoir précisément lesquelles ont changé.
+
+Le statut livré n'est pas une cible manuelle : seule la réception
+(``stock.receive_order``) le pose, en faisant entrer la marchandise en stock.
+Une commande passée à la main au statut livré ne pourrait plus être
+réceptionnée.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import dashboard
+from .models import Order
+
+
+# Nombre maximal de commandes par changement de statut en masse
+BULK_TRANSITION_MAX = 1000
+
+DELIVERED_STATUS = "delivered"
+
+# Statuts accessibles par orders/{id}/status/ et orders/bulk-status/
+MANUAL_STATUSES = [
+    order_status for order_status in Order.TRANSITIONS if order_status != DELIVERED_STATUS
+]
+
+
+def manual_targets(current_status):
+    """Statuts accessibles à la main depuis ``current_status``"""
+    return [
+        order_status
+        for order_status in Order.TRANSITIONS.get(current_status, [])
+        if order_status in MANUAL_STATUSES
+    ]
+
+
+def transition_orders(order_ids, new_status, supplier=None):
+    """
+    Fait passer les commandes ``order_ids`` au statut ``new_status``.
+
+    Avec ``supplier``, seules les commandes de ce fournisseur sont
+    concernées. Retourne ``(ids déplacés, refus)``, chaque refus étant
+    ``{"id", "status", "error"}`` (``status`` vaut None pour une commande
+    introuvable). Lève ``ValueError`` si ``new_status`` n'est pas dans
+    ``MANUAL_STATUSES``.
+    """
+    if new_status not in MANUAL_STATUSES:
+        raise ValueError(f"Statut non accessible manuellement : {new_status}")
+    order_ids = list(dict.fromkeys(order_ids))
+    allowed_from = Order.allowed_from(new_status)
+    orders = Order.objects.filter(pk__in=order_ids)
+    if supplier is not None:
+        orders = orders.filter(supplier=supplier)
+
+    with transaction.atomic():
+        current = dict(
+            orders.select_for_update().order_by("pk").values_list("pk", "status")
+        )
+        moved = [pk for pk in order_ids if current.get(pk) in allowed_from]
+        if moved:
+            # Lignes verrouillées : l'UPDATE touche exactement ``moved``
+            Order.objects.filter(pk__in=moved, status__in=allowed_from).update(
+                status=new_status, updated_at=timezone.now()
+            )
+
+            # Les signaux de Order ne sont pas déclenchés par update()
+            for previous, count in Counter(current[pk] for pk in moved).items():
+                dashboard.bump(dashboard.order_status_key(previous), -count)
+            dashboard.bump(dashboard.order_status_key(new_status), len(moved))
+
+    moved_ids = set(moved)
+    rejected = []
+    for pk in order_ids:
+        if pk in current and pk not in moved_ids:
+            rejected.append(
+                {
+                    "id": pk,
+                    "status": current[pk],
+                    "error": f"Transition {current[pk]} -> {new_status} non autorisée",
+                }
+            )
+        elif pk not in current:
+            rejected.append({"id": pk, "status": None, "error": "Commande introuvable"})
+    return moved, rejected
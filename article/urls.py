@@ -7,7 +7,7 @@ from django.conf.urls.static import static
 
 
 from django.conf import settings
-from . import views
+from . import async_views, views
 from .views import CategoryViewSet, ArticleViewSet
 from .views import StockMovementViewSet, Article,RestockRequestViewSet
 
@@ -17,22 +17,32 @@ router.register(r"categories", CategoryViewSet, basename="category")
 router.register(r"articles", ArticleViewSet, basename="article")
 
 router.register(r"stock-movements", StockMovementViewSet, basename="stock-movement")
+router.register(r"stock-alerts", views.StockAlertViewSet, basename="stock-alert")
+router.register(r"warehouses", views.WarehouseViewSet, basename="warehouse")
+router.register(r"stock-levels", views.StockLevelViewSet, basename="stock-level")
 
 router.register(r'restock-requests', RestockRequestViewSet, basename='restockrequest')
 urlpatterns = [
     path("", include(router.urls)),
     # path("article/", views.Article, name="art"),
-    path('article/', views.list_articles, name='article-list'),
+    path('article/', async_views.list_articles, name='article-list'),
 
     
     # =============================================================================
     # ORDER URLS
     # =============================================================================
     path("orders/", views.OrderListCreateView.as_view(), name="order-list-create"),
+    path("orders/bulk/", views.bulk_create_orders, name="order-bulk-create"),
+    path(
+        "orders/bulk-status/",
+        views.bulk_update_order_status,
+        name="order-bulk-status",
+    ),
     path("orders/<int:pk>/", views.OrderDetailView.as_view(), name="order-detail"),
     path(
         "orders/<int:pk>/status/", views.update_order_status, name="update-order-status"
     ),
+    path("orders/<int:pk>/receive/", views.receive_order, name="order-receive"),
     # =============================================================================
     # ORDER ITEM URLS
     # =============================================================================
@@ -65,15 +75,30 @@ urlpatterns = [
         views.set_preferred_supplier,
         name="set-preferred-supplier",
     ),
+    path(
+        "articles/<int:article_id>/suppliers/",
+        async_views.article_suppliers_by_article,
+        name="article-suppliers",
+    ),
     path(
         "suppliers/<int:supplier_id>/articles/",
-        views.supplier_articles,
+        async_views.supplier_articles,
         name="supplier-articles",
     ),
     # =============================================================================
+    # EXPORT URLS
+    # =============================================================================
+    path("export/articles/", views.export_articles, name="export-articles"),
+    path(
+        "export/stock-movements/",
+        views.export_stock_movements,
+        name="export-stock-movements",
+    ),
+    path("export/orders/", views.export_orders, name="export-orders"),
+    # =============================================================================
     # DASHBOARD & STATS URLS
     # =============================================================================
-    path("dashboard/stats/", views.dashboard_stats, name="dashboard-stats"),
+    path("dashboard/stats/", async_views.dashboard_stats, name="dashboard-stats"),
 ]
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
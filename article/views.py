@@ -4,15 +4,34 @@ from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
 from .models import Category, Article,RestockRequest
 from .serializers import CategorySerializer, ArticleSerializer
 from .permissions import IsGestionnaire
+from .pagination import CreatedAtCursorPagination
+from .filters import (
+    ArticleFilter,
+    OrderFilter,
+    OrderItemFilter,
+    StockAlertFilter,
+    StockLevelFilter,
+    StockMovementFilter,
+)
+from .exports import EXPORT_FORMATS, stream_export
+from . import conditional, pricing, reorder, search, snapshots, stock, transitions
+from .stock import BULK_MOVEMENTS_MAX, ingest_movements
+from datetime import datetime, time, timedelta
+from users.utils import has_role
 from rest_framework import generics, status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, ProtectedError, Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django.contrib.auth import get_user_model
-from .models import Category, Article, Order, OrderItem, ArticleSupplier,StockMovement
+from .models import Category, Article, Order, OrderItem, ArticleSupplier,StockMovement, StockAlert, StockLevel, Warehouse
 from .serializers import (
     CategorySerializer,
     ArticleSerializer,
@@ -20,13 +39,25 @@ from .serializers import (
     OrderItemSerializer,
     ArticleSupplierSerializer,
     StockMovementSerializer,
-    RestockRequestSerializer
+    StockMovementBulkItemSerializer,
+    RestockRequestSerializer,
+    StockAlertSerializer,
+    ReorderParamsSerializer,
+    StockLevelSerializer,
+    WarehouseSerializer,
+    OrderReceiptSerializer,
 )
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(conditional.ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
+    def get_collection_version(self):
+        return conditional.category_collection_version()
+
+    def get_object_version(self, pk):
+        return conditional.category_object_version(pk)
+
     def get_permissions(self):
         if self.request.method in SAFE_METHODS:  # GET, HEAD, OPTIONS sont ouverts à tous authentifiés
             permission_classes = [IsAuthenticated]
@@ -36,9 +67,22 @@ class CategoryViewSet(viewsets.ModelViewSet):
 
 from rest_framework.parsers import MultiPartParser, FormParser
 
-class ArticleViewSet(viewsets.ModelViewSet):
+# Nombre de résultats de la recherche d'articles (par défaut / maximum)
+SEARCH_LIMIT = 10
+SEARCH_MAX_LIMIT = 50
+
+
+class ArticleViewSet(conditional.ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Article.objects.all().select_related('category')
     serializer_class = ArticleSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = ArticleFilter  # ?critical=true utilise l'index de is_critical
+
+    def get_collection_version(self):
+        return conditional.article_collection_version()
+
+    def get_object_version(self, pk):
+        return conditional.article_object_version(pk)
     
     
     
@@ -55,18 +99,132 @@ class ArticleViewSet(viewsets.ModelViewSet):
             permission_classes = [IsAuthenticated, IsGestionnaire]
         return [permission() for permission in permission_classes]
 
+    @action(detail=False, methods=["get"], url_path="search")
+    def search_articles(self, request):
+        """
+        Recherche classée par préfixe (autocomplétion)
+        GET /api/articles/search/?q=ecr&limit=10
+        Nom, début de référence, catégorie et références fournisseurs.
+        """
+        try:
+            limit = min(int(request.query_params.get("limit", SEARCH_LIMIT)), SEARCH_MAX_LIMIT)
+        except ValueError:
+            return Response(
+                {"error": "Le paramètre limit doit être un entier"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        matches = search.search(request.query_params.get("q", ""), max(limit, 1))
+        articles = Article.objects.select_related("category").in_bulk(
+            [article_id for article_id, _ in matches]
+        )
+        results = []
+        for article_id, score in matches:
+            if article_id in articles:
+                data = self.get_serializer(articles[article_id]).data
+                data["score"] = score
+                results.append(data)
+        return Response(results)
+
+    @action(detail=False, methods=["get"], url_path="reorder-recommendations")
+    def reorder_recommendations(self, request):
+        """
+        Points de commande et quantités suggérées, calculés en un lot
+        GET /api/articles/reorder-recommendations/?window_days=90&safety_days=7&review_days=14&all=false
+        Sans all=true, seuls les articles à réapprovisionner sont retournés.
+        Le lot est mis en cache quelques secondes (REORDER_CACHE_SECONDS) :
+        les pages suivantes ne relancent pas le calcul.
+        """
+        params = ReorderParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        options = dict(params.validated_data)
+        include_all = options.pop("all")
+
+        computed_at, rows = reorder.cached_recommendations(include_all, **options)
+        page = self.paginate_queryset(rows)
+        response = self.get_paginated_response(page)
+        response.data["computed_at"] = computed_at
+        return response
+
+    @action(detail=False, methods=["get"], url_path="stock-at")
+    def stock_at(self, request):
+        """
+        Stock de chaque article à une date donnée
+        GET /api/articles/stock-at/?date=2026-06-30 (fin de journée)
+        GET /api/articles/stock-at/?date=2026-06-30T12:00:00Z
+        """
+        value = request.query_params.get("date", "")
+        day = parse_date(value)
+        if day is not None:
+            moment = datetime.combine(day + timedelta(days=1), time.min)
+        else:
+            moment = parse_datetime(value)
+        if moment is None:
+            return Response(
+                {"error": "Paramètre date requis (AAAA-MM-JJ ou date ISO 8601)"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+
+        page = self.paginate_queryset(
+            Article.objects.order_by("name", "id").only("id", "name", "reference")
+        )
+        taken_at, stock = snapshots.stock_at(moment, [article.pk for article in page])
+        response = self.get_paginated_response(
+            [
+                {
+                    "id": article.pk,
+                    "name": article.name,
+                    "reference": article.reference,
+                    "quantity": stock.get(article.pk, 0),
+                }
+                for article in page
+            ]
+        )
+        response.data["date"] = moment
+        response.data["snapshot_taken_at"] = taken_at
+        return response
+
+    @action(detail=False, methods=["get"], url_path="supplier-matrix")
+    def supplier_matrix(self, request):
+        """
+        Prix min / max / médian, écart, fournisseur le moins cher et préféré par article
+        GET /api/articles/supplier-matrix/?page=2&page_size=50
+        Seuls les articles ayant au moins un fournisseur sont listés.
+        Réponse mise en cache quelques secondes (SUPPLIER_MATRIX_CACHE_SECONDS).
+        """
+        key = f"{pricing.CACHE_PREFIX}:{request.get_full_path()}"
+        data = cache.get(key)
+        if data is None:
+            page = self.paginate_queryset(
+                Article.objects.filter(
+                    Exists(ArticleSupplier.objects.filter(article=OuterRef("pk")))
+                )
+                .order_by("name", "id")
+                .only("id", "name", "reference")
+            )
+            matrix = pricing.supplier_matrix([article.pk for article in page])
+            data = self.get_paginated_response(
+                [
+                    {
+                        "id": article.pk,
+                        "name": article.name,
+                        "reference": article.reference,
+                        **matrix[article.pk],
+                    }
+                    for article in page
+                    if article.pk in matrix
+                ]
+            ).data
+            cache.set(key, data, pricing.cache_seconds())
+        return Response(data)
+
 # class Article(viewsets.ModelViewSet):
 
     
 
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def list_articles(request):
-    articles = Article.objects.all().select_related('category')
-    serializer = ArticleSerializer(articles, many=True)
-    return Response(serializer.data)
 # views.py
 
 
@@ -91,20 +249,62 @@ class OrderListCreateView(generics.ListCreateAPIView):
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'supplier']
+    filterset_class = OrderFilter
     search_fields = ['order_number', 'supplier__username']
-    ordering_fields = ['order_date', 'expected_delivery_date', 'total_amount', 'created_at']
-    ordering = ['-created_at']
+    ordering_fields = ['order_date', 'expected_delivery_date', 'total_amount', 'created_at',
+                       'item_count', 'outstanding_quantity']
+    ordering = ['-created_at', 'id']
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         """Filtre les commandes selon le rôle de l'utilisateur"""
         user = self.request.user
-        if user.groups.filter(name='fournisseur').exists():
+        if has_role(user, 'fournisseur'):
             # Si l'utilisateur est fournisseur, il ne voit que ses commandes
-            return Order.objects.filter(supplier=user).select_related('supplier', 'user').prefetch_related('order_items__article')
+            return Order.objects.filter(supplier=user).with_item_stats().select_related('supplier', 'user').prefetch_related('order_items__article')
         else:
             # Sinon, il voit toutes les commandes
-            return Order.objects.all().select_related('supplier', 'user').prefetch_related('order_items__article')
+            return Order.objects.with_item_stats().select_related('supplier', 'user').prefetch_related('order_items__article')
+
+
+# Nombre maximal de commandes acceptées par import
+BULK_ORDERS_MAX = 200
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_create_orders(request):
+    """
+    Importe plusieurs commandes dans une seule transaction
+    POST /api/orders/bulk/
+    Body: [{"supplier": 3, "order_items": [{"article": 1, "quantity_ordered": 5, "unit_price": "2.50"}]}, ...]
+    """
+    if not isinstance(request.data, list) or not request.data:
+        return Response(
+            {'error': 'Une liste de commandes est requise'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(request.data) > BULK_ORDERS_MAX:
+        return Response(
+            {'error': f'Au plus {BULK_ORDERS_MAX} commandes par import'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    serializer = OrderSerializer(data=request.data, many=True, context={'request': request})
+    if not serializer.is_valid():
+        return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    orders = serializer.save()
+    return Response(
+        {
+            'created': len(orders),
+            'orders': [
+                {'id': order.id, 'order_number': order.order_number, 'total_amount': str(order.total_amount)}
+                for order in orders
+            ],
+        },
+        status=status.HTTP_201_CREATED
+    )
 
 
 class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -121,10 +321,17 @@ class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         """Filtre les commandes selon le rôle de l'utilisateur"""
         user = self.request.user
-        if user.groups.filter(name='fournisseur').exists():
-            return Order.objects.filter(supplier=user).select_related('supplier', 'user').prefetch_related('order_items__article')
+        if has_role(user, 'fournisseur'):
+            return Order.objects.filter(supplier=user).with_item_stats().select_related('supplier', 'user').prefetch_related('order_items__article')
         else:
-            return Order.objects.all().select_related('supplier', 'user').prefetch_related('order_items__article')
+            return Order.objects.with_item_stats().select_related('supplier', 'user').prefetch_related('order_items__article')
+
+
+# Le statut livré n'est posé que par la réception, voir article.transitions
+DELIVERED_BY_RECEIPT_ERROR = (
+    "Le statut livré est posé par la réception de la commande "
+    "(POST /api/orders/{id}/receive/)"
+)
 
 
 @api_view(['PATCH'])
@@ -139,7 +346,7 @@ def update_order_status(request, pk):
     
     # Vérifier les permissions
     user = request.user
-    if user.groups.filter(name='fournisseur').exists() and order.supplier != user:
+    if has_role(user, 'fournisseur') and order.supplier != user:
         return Response(
             {'error': 'Vous ne pouvez modifier que vos propres commandes'}, 
             status=status.HTTP_403_FORBIDDEN
@@ -153,20 +360,70 @@ def update_order_status(request, pk):
         )
     
     # Valider les statuts autorisés
-    valid_statuses = ['en_attente', 'confirmee', 'en_cours', 'livree', 'annulee']
-    if new_status not in valid_statuses:
+    if new_status == transitions.DELIVERED_STATUS:
         return Response(
-            {'error': f'Statut non valide. Statuts autorisés: {valid_statuses}'}, 
+            {'error': DELIVERED_BY_RECEIPT_ERROR},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if new_status not in transitions.MANUAL_STATUSES:
+        return Response(
+            {'error': f'Statut non valide. Statuts autorisés: {transitions.MANUAL_STATUSES}'},
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    order.status = new_status
-    order.save()
+    moved, rejected = transitions.transition_orders([order.pk], new_status)
+    if rejected:
+        return Response(
+            {
+                'error': rejected[0]['error'],
+                'allowed': transitions.manual_targets(rejected[0]['status']),
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
+    order.refresh_from_db()
     serializer = OrderSerializer(order)
     return Response(serializer.data)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_update_order_status(request):
+    """
+    Change le statut de plusieurs commandes en une requête UPDATE
+    POST /api/orders/bulk-status/
+    Body: {"ids": [1, 2, 3], "status": "confirmed"}
+    Réponse: {"moved": [1, 3], "rejected": [{"id": 2, "status": "delivered", "error": "..."}]}
+    """
+    ids = request.data.get('ids') if isinstance(request.data, dict) else None
+    new_status = request.data.get('status') if isinstance(request.data, dict) else None
+    if not isinstance(ids, list) or not ids or not all(isinstance(pk, int) for pk in ids):
+        return Response(
+            {'error': "Une liste d'identifiants (ids) est requise"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(ids) > transitions.BULK_TRANSITION_MAX:
+        return Response(
+            {'error': f'Au plus {transitions.BULK_TRANSITION_MAX} commandes par lot'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if new_status == transitions.DELIVERED_STATUS:
+        return Response(
+            {'error': DELIVERED_BY_RECEIPT_ERROR},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if new_status not in transitions.MANUAL_STATUSES:
+        return Response(
+            {'error': f'Statut non valide. Statuts autorisés: {transitions.MANUAL_STATUSES}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Un fournisseur ne peut modifier que ses propres commandes
+    supplier = request.user if has_role(request.user, 'fournisseur') else None
+    moved, rejected = transitions.transition_orders(ids, new_status, supplier=supplier)
+    return Response({'status': new_status, 'moved': moved, 'rejected': rejected})
+
+
 # =============================================================================
 # ORDER ITEM VIEWS
 # =============================================================================
@@ -180,9 +437,10 @@ class OrderItemListView(generics.ListAPIView):
     serializer_class = OrderItemSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = ['order', 'article']
-    ordering_fields = ['quantity_ordered', 'unit_price', 'total_price']
-    ordering = ['-order__created_at']
+    filterset_class = OrderItemFilter
+    ordering_fields = ['quantity_ordered', 'unit_price', 'total_price', 'remaining_quantity', 'created_at']
+    ordering = ['-created_at', 'id']
+    pagination_class = CreatedAtCursorPagination
 
 
 class OrderItemDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -198,6 +456,46 @@ class OrderItemDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsGestionnaire])
+def receive_order(request, pk):
+    """
+    Réceptionne une commande : toutes les lignes reçues en une transaction
+    POST /api/orders/{id}/receive/
+    Body: {"items": [{"order_item": 5, "quantity_received": 10}, ...], "warehouse": 2}
+
+    quantity_received est la quantité reçue cumulée de la ligne : seul
+    l'écart avec ce qui était déjà reçu entre en stock, un renvoi de la
+    même requête est donc sans effet. Une commande annulée ou déjà livrée
+    est refusée (400).
+    """
+    get_object_or_404(Order, pk=pk)
+    serializer = OrderReceiptSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    warehouse = serializer.validated_data.get('warehouse')
+    order, movements, errors = stock.receive_order(
+        pk,
+        [
+            (line['order_item'], line['quantity_received'])
+            for line in serializer.validated_data['items']
+        ],
+        request.user,
+        warehouse_id=warehouse.pk if warehouse else None,
+    )
+    if errors:
+        return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    order = (
+        Order.objects.with_item_stats()
+        .select_related('supplier', 'user')
+        .prefetch_related('order_items__article')
+        .get(pk=order.pk)
+    )
+    return Response({'received': len(movements), 'order': OrderSerializer(order).data})
+
+
 @api_view(['PATCH'])
 @permission_classes([IsAuthenticated])
 def update_received_quantity(request, pk):
@@ -205,11 +503,14 @@ def update_received_quantity(request, pk):
     Met à jour la quantité reçue d'un élément de commande
     PATCH /api/order-items/{id}/received-quantity/
     Body: {"quantity_received": 10}
+
+    Réception d'une seule ligne, voir receive_order (POST /api/orders/{id}/receive/).
     """
     order_item = get_object_or_404(OrderItem, pk=pk)
     
-    quantity_received = request.data.get('quantity_received')
-    if quantity_received is None:
+    try:
+        quantity_received = int(request.data.get('quantity_received'))
+    except (TypeError, ValueError):
         return Response(
             {'error': 'La quantité reçue est requise'}, 
             status=status.HTTP_400_BAD_REQUEST
@@ -221,22 +522,16 @@ def update_received_quantity(request, pk):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    if quantity_received > order_item.quantity_ordered:
+    _, _, errors = stock.receive_order(
+        order_item.order_id, [(order_item.pk, quantity_received)], request.user
+    )
+    if errors:
         return Response(
-            {'error': 'La quantité reçue ne peut dépasser la quantité commandée'}, 
+            {'error': next(iter(errors[0]['errors'].values()))[0]},
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    order_item.quantity_received = quantity_received
-    order_item.save()
-    
-    # Mettre à jour le stock de l'article
-    if quantity_received > 0:
-        article = order_item.article
-        article.quantity += quantity_received
-        article.save()
-    
-    serializer = OrderItemSerializer(order_item)
+    serializer = OrderItemSerializer(OrderItem.objects.get(pk=pk))
     return Response(serializer.data)
 
 
@@ -273,32 +568,6 @@ class ArticleSupplierDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def article_suppliers_by_article(request, article_id):
-    """
-    Liste des fournisseurs pour un article donné
-    GET /api/articles/{article_id}/suppliers/
-    """
-    article = get_object_or_404(Article, pk=article_id)
-    article_suppliers = ArticleSupplier.objects.filter(article=article).select_related('supplier')
-    serializer = ArticleSupplierSerializer(article_suppliers, many=True)
-    return Response(serializer.data)
-
-
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def supplier_articles(request, supplier_id):
-    """
-    Liste des articles pour un fournisseur donné
-    GET /api/suppliers/{supplier_id}/articles/
-    """
-    supplier = get_object_or_404(User, pk=supplier_id)
-    article_suppliers = ArticleSupplier.objects.filter(supplier=supplier).select_related('article')
-    serializer = ArticleSupplierSerializer(article_suppliers, many=True)
-    return Response(serializer.data)
-
-
 @api_view(['PATCH'])
 @permission_classes([IsAuthenticated])
 def set_preferred_supplier(request, pk):
@@ -322,46 +591,120 @@ def set_preferred_supplier(request, pk):
 
 
 # =============================================================================
-# VUES STATISTIQUES ET REPORTING
+# EXPORTS EN FLUX
 # =============================================================================
-from django.db.models import Count, F
+
+def _export(request, queryset, filterset_class, fields, filename):
+    output = request.query_params.get("output", "csv")
+    if output not in EXPORT_FORMATS:
+        return Response(
+            {'error': f'Format non valide. Formats autorisés: {list(EXPORT_FORMATS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    filterset = filterset_class(request.query_params, queryset=queryset, request=request)
+    if not filterset.is_valid():
+        return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+    return stream_export(filterset.qs, fields, output, filename)
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def dashboard_stats(request):
+def export_articles(request):
     """
-    Statistiques pour le tableau de bord
-    GET /api/dashboard/stats/
+    Export en flux des articles
+    GET /api/export/articles/?output=csv|ndjson&category=&supplier=
     """
-    from django.db.models import Count, Sum
-    
-    stats = {
-        'total_articles': Article.objects.count(),
-        'critical_articles':Article.objects.filter(quantity__lte=F('critical_threshold')).count(),
-        'total_categories': Category.objects.count(),
-        'pending_orders': Order.objects.filter(status='en_attente').count(),
-        'total_orders': Order.objects.count(),
-        'total_suppliers': User.objects.filter(groups__name='fournisseur').count(),
-        'orders_by_status': list(
-            Order.objects.values('status')
-            .annotate(count=Count('id'))
-            .order_by('status')
-        ),
-        'top_articles': list(
-            Article.objects.annotate(
-                order_count=Count('order_items')
-            ).order_by('-order_count')[:5]
-            .values('id', 'name', 'order_count')
-        )
-    }
-    
-    return Response(stats)
+    fields = ["id", "name", "reference", "category__name", "unit_price",
+              "quantity", "critical_threshold", "created_at"]
+    return _export(request, Article.objects.all(), ArticleFilter, fields, "articles")
+
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_stock_movements(request):
+    """
+    Export en flux des mouvements de stock
+    GET /api/export/stock-movements/?output=csv|ndjson&date_from=&date_to=&article=&movement_type=
+    """
+    fields = ["id", "created_at", "article_id", "article__name", "movement_type",
+              "quantity", "reference_document", "user__username"]
+    return _export(
+        request, StockMovement.objects.all(), StockMovementFilter, fields, "stock-movements"
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_orders(request):
+    """
+    Export en flux des commandes
+    GET /api/export/orders/?output=csv|ndjson&status=&supplier=&date_from=&date_to=
+    """
+    queryset = Order.objects.all()
+    if has_role(request.user, 'fournisseur'):
+        queryset = queryset.filter(supplier=request.user)
+    fields = ["id", "order_number", "supplier_id", "supplier__username", "status",
+              "order_date", "expected_delivery_date", "actual_delivery_date",
+              "total_amount", "created_at"]
+    return _export(request, queryset, OrderFilter, fields, "orders")
+
+
+# =============================================================================
+# VUES STATISTIQUES ET REPORTING
+# =============================================================================
+# Voir article.async_views : dashboard_stats, list_articles et les listes
+# d'associations article-fournisseur y sont servies de façon asynchrone.
+
+
+# Fonctions de troncature SQL par granularité de série temporelle
+TIMESERIES_BUCKETS = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+
+
+class WarehouseViewSet(viewsets.ModelViewSet):
+    """
+    Entrepôts
+    GET /api/warehouses/ - lecture pour tout utilisateur connecté
+    POST/PUT/PATCH/DELETE - gestionnaires (suppression refusée si du stock
+    ou des mouvements y font référence)
+    """
+    queryset = Warehouse.objects.all()
+    serializer_class = WarehouseSerializer
+
+    def get_permissions(self):
+        if self.request.method in SAFE_METHODS:
+            return [IsAuthenticated()]
+        return [IsAuthenticated(), IsGestionnaire()]
+
+    def destroy(self, request, *args, **kwargs):
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except ProtectedError:
+            return Response(
+                {"error": "Cet entrepôt contient du stock ou des mouvements"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+
+class StockLevelViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Stock par article et par entrepôt (modifié uniquement par les mouvements)
+    GET /api/stock-levels/?article=&warehouse=&in_stock=true
+    """
+    queryset = StockLevel.objects.select_related("article", "warehouse").order_by(
+        "warehouse_id", "article_id"
+    )
+    serializer_class = StockLevelSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = StockLevelFilter
 
 
 class StockMovementViewSet(viewsets.ModelViewSet):
     queryset = StockMovement.objects.select_related("article", "user").all()
     serializer_class = StockMovementSerializer
+    pagination_class = CreatedAtCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = StockMovementFilter
 
     def get_permissions(self):
         if self.request.method in SAFE_METHODS:
@@ -370,10 +713,120 @@ class StockMovementViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
-        
-    
 
-from rest_framework.decorators import action
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Import en masse de mouvements de stock dans une seule transaction
+        POST /api/stock-movements/bulk/
+        Body: [{"article": 1, "movement_type": "in", "quantity": 10}, ...]
+        Entrepôts optionnels : source_warehouse, destination_warehouse
+        (obligatoires pour un transfert)
+        """
+        items = request.data
+        if isinstance(items, dict):
+            items = items.get("movements")
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"error": "Une liste de mouvements est requise"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > BULK_MOVEMENTS_MAX:
+            return Response(
+                {"error": f"Au plus {BULK_MOVEMENTS_MAX} mouvements par lot"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        validated, errors = [], []
+        for index, item in enumerate(items):
+            serializer = StockMovementBulkItemSerializer(data=item)
+            if serializer.is_valid():
+                validated.append(serializer.validated_data)
+            else:
+                errors.append({"index": index, "errors": serializer.errors})
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        movements, errors = ingest_movements(validated, request.user)
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({"created": len(movements)}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["get"], url_path="timeseries")
+    def timeseries(self, request):
+        """
+        Totaux des mouvements par période, agrégés en SQL, hors écritures de
+        journal (quantité de création, corrections directes, reprise)
+        GET /api/stock-movements/timeseries/?bucket=day|week|month&article=&category=&type=&date_from=&date_to=
+        """
+        bucket = request.query_params.get("bucket", "day")
+        if bucket not in TIMESERIES_BUCKETS:
+            return Response(
+                {"error": f"Période non valide. Périodes autorisées: {list(TIMESERIES_BUCKETS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        filterset = StockMovementFilter(
+            request.query_params, queryset=StockMovement.objects.all(), request=request
+        )
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        totals = {
+            movement_type: Sum("quantity", filter=Q(movement_type=movement_type))
+            for movement_type, _ in StockMovement.MOVEMENT_TYPES
+        }
+        rows = (
+            filterset.qs.exclude(reference_document__in=StockMovement.JOURNAL_REFERENCES)
+            .order_by()
+            .annotate(bucket=TIMESERIES_BUCKETS[bucket]("created_at"))
+            .values("bucket")
+            .annotate(**totals)
+            .order_by("bucket")
+        )
+        return Response(
+            [
+                {
+                    "bucket": row["bucket"],
+                    **{movement_type: row[movement_type] or 0 for movement_type in totals},
+                }
+                for row in rows
+            ]
+        )
+
+
+
+class StockAlertViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Boîte d'envoi des alertes de franchissement du seuil critique
+    GET /api/stock-alerts/?pending=true&article=&kind=low_stock|restocked
+    POST /api/stock-alerts/acknowledge/ - Body: {"ids": [1, 2]}
+    """
+    queryset = StockAlert.objects.select_related("article").all()
+    serializer_class = StockAlertSerializer
+    pagination_class = CreatedAtCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = StockAlertFilter
+
+    def get_permissions(self):
+        if self.request.method in SAFE_METHODS:
+            return [IsAuthenticated()]
+        return [IsAuthenticated(), IsGestionnaire()]
+
+    @action(detail=False, methods=["post"], url_path="acknowledge")
+    def acknowledge(self, request):
+        """Marque des alertes comme distribuées"""
+        ids = request.data.get("ids") if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+            return Response(
+                {"error": "Une liste d'identifiants (ids) est requise"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        updated = StockAlert.objects.filter(pk__in=ids, dispatched_at__isnull=True).update(
+            dispatched_at=timezone.now()
+        )
+        return Response({"acknowledged": updated})
+
 
 class RestockRequestViewSet(viewsets.ModelViewSet):
     # queryset = RestockRequest.objects.all().order_by('-created_at')
@@ -384,7 +837,7 @@ class RestockRequestViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
-        if user.is_staff or user.groups.filter(name='gestionnaire').exists():
+        if user.is_staff or has_role(user, 'gestionnaire'):
             return RestockRequest.objects.all().order_by('-created_at')
         return RestockRequest.objects.filter(requester=user).order_by('-created_at')
     def perform_create(self, serializer):
@@ -392,7 +845,7 @@ class RestockRequestViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], url_path='approve')
     def approve(self, request, pk=None):
         restock_request = self.get_object()
-        if not request.user.groups.filter(name='gestionnaire').exists():
+        if not has_role(request.user, 'gestionnaire'):
             return Response({"detail": "Non autorisé"}, status=status.HTTP_403_FORBIDDEN)
 
         restock_request.status = 'approved'
@@ -402,7 +855,7 @@ class RestockRequestViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], url_path='reject')
     def reject(self, request, pk=None):
         restock_request = self.get_object()
-        if not request.user.groups.filter(name='gestionnaire').exists():
+        if not has_role(request.user, 'gestionnaire'):
             return Response({"detail": "Non autorisé"}, status=status.HTTP_403_FORBIDDEN)
 
         restock_request.status = 'rejected'
@@ -0,0 +1,178 @@
+"""
+Pool de connexions pour les vues asynchrones, et ses métriques.
+
+Django ne propose pas de pool pour MySQL : les connexions sont persistantes
+par thread (``CONN_MAX_AGE``) et vérifiées avant réutilisation
+(``CONN_HEALTH_CHECKS``). Le pool est donc un ``ThreadPoolExecutor`` de
+``DATABASE_POOL_SIZE`` threads, chacun gardant sa connexion ouverte d'une
+tâche à l'autre : au plus ``DATABASE_POOL_SIZE`` connexions par processus
+pour les requêtes lancées par ``run_in_pool``, sans reconnexion à chaque
+requête HTTP.
+
+Sous ASGI, ``CONN_MAX_AGE`` vaut 0 (un thread par requête) ; les connexions
+des threads du pool suivent alors ``DATABASE_POOL_CONN_MAX_AGE``.
+
+Les métriques (occupation, attente d'un thread libre, connexions ouvertes)
+sont exposées par ``GET /api/admin/db-pool/`` (staff seulement) ; une
+attente supérieure à ``DATABASE_POOL_WAIT_WARNING_MS`` est journalisée.
+"""
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_WAIT_WARNING_MS = 100
+DEFAULT_POOL_CONN_MAX_AGE = 300
+
+# Marque les threads du pool, dont les connexions restent persistantes
+_pool_thread = threading.local()
+
+
+def pool_size():
+    return getattr(settings, "DATABASE_POOL_SIZE", DEFAULT_POOL_SIZE)
+
+
+def pool_conn_max_age():
+    return getattr(settings, "DATABASE_POOL_CONN_MAX_AGE", DEFAULT_POOL_CONN_MAX_AGE)
+
+
+def _mark_pool_thread():
+    _pool_thread.active = True
+
+
+class PoolStats:
+    def __init__(self, size):
+        self.size = size
+        self.started_at = time.monotonic()
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.tasks = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.connections_opened = 0
+        # Connexions créées (tous threads) : ouvertes ou non, selon l'instant
+        self._wrappers = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def connection_opened(self, wrapper):
+        with self._lock:
+            self.connections_opened += 1
+            self._wrappers.add(wrapper)
+
+    def task_started(self, wait):
+        with self._lock:
+            self.tasks += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def task_finished(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def snapshot(self):
+        with self._lock:
+            uptime = time.monotonic() - self.started_at
+            open_connections = sum(
+                1 for wrapper in list(self._wrappers) if wrapper.connection is not None
+            )
+            return {
+                "pool_size": self.size,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "utilisation": round(self.in_use / self.size, 3),
+                "tasks": self.tasks,
+                "avg_wait_ms": round(self.total_wait / self.tasks * 1000, 2)
+                if self.tasks
+                else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+                "open_connections": open_connections,
+                "connections_opened": self.connections_opened,
+                "connections_opened_per_minute": round(
+                    self.connections_opened / uptime * 60, 2
+                )
+                if uptime
+                else 0.0,
+                "uptime_s": round(uptime),
+            }
+
+
+stats = PoolStats(pool_size())
+_executor = ThreadPoolExecutor(
+    max_workers=stats.size, thread_name_prefix="db-pool", initializer=_mark_pool_thread
+)
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    stats.connection_opened(connection)
+    if getattr(_pool_thread, "active", False):
+        # Remplace l'échéance calculée depuis CONN_MAX_AGE par connect()
+        max_age = pool_conn_max_age()
+        connection.close_at = None if max_age is None else time.monotonic() + max_age
+
+
+def _run(func, submitted_at):
+    wait = time.monotonic() - submitted_at
+    stats.task_started(wait)
+    if wait * 1000 > getattr(
+        settings, "DATABASE_POOL_WAIT_WARNING_MS", DEFAULT_WAIT_WARNING_MS
+    ):
+        logger.warning(
+            "Pool SQL saturé : %.1f ms d'attente (%d/%d threads occupés)",
+            wait * 1000,
+            stats.in_use,
+            stats.size,
+        )
+    # Comme au début et à la fin d'une requête HTTP : ferme les connexions
+    # périmées et arme le health check de la prochaine utilisation
+    close_old_connections()
+    try:
+        return func()
+    finally:
+        close_old_connections()
+        stats.task_finished()
+
+
+def run_in_pool(func):
+    """
+    Coroutine exécutant ``func`` (sans argument) dans un thread du pool,
+    sur la connexion persistante de ce thread.
+    """
+    return sync_to_async(_run, thread_sensitive=False, executor=_executor)(
+        func, time.monotonic()
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def pool_stats_view(request):
+    """
+    Métriques du pool de connexions du processus courant
+    GET /api/admin/db-pool/
+    """
+    return Response(
+        {
+            **stats.snapshot(),
+            "conn_max_age": {
+                alias: config.get("CONN_MAX_AGE", 0)
+                for alias, config in settings.DATABASES.items()
+            },
+            "pool_conn_max_age": pool_conn_max_age(),
+        }
+    )
@@ -0,0 +1,160 @@
+"""
+Répartition des requêtes SQL entre la base principale et ses réplicas.
+
+- Les requêtes HTTP en lecture (GET, HEAD, OPTIONS) lisent sur un réplica
+  de ``DATABASE_REPLICAS`` ; toutes les écritures vont sur ``default``.
+- Lecture de ses propres écritures : dès qu'une requête exécute une
+  écriture (INSERT, UPDATE, DELETE, repérés par un ``execute_wrapper`` ;
+  un ``get_or_create`` qui ne crée rien n'en est pas une), la suite de la
+  requête lit sur ``default``, et un cookie garde le client sur
+  ``default`` pendant ``REPLICA_PIN_SECONDS`` (délai de réplication).
+- Hors requête HTTP (commandes, shell), tout passe par ``default`` sauf
+  dans un bloc ``read_from_replica()``, prévu pour les rapports.
+
+Sans réplica configuré, le routeur envoie tout sur ``default``. Les
+réponses en flux lisent après la fin de la vue, hors de ce contexte : leur
+queryset doit être lié à sa base avant (voir ``bind_read_database``).
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+PIN_COOKIE = "db_primary"
+DEFAULT_PIN_SECONDS = 5
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+class RoutingState:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        # Partagé par référence : une écriture faite dans un thread de
+        # sync_to_async épingle aussi le reste de la requête
+        self.wrote = False
+
+
+_state = ContextVar("db_routing_state", default=None)
+
+
+def replicas():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+def pin_seconds():
+    return getattr(settings, "REPLICA_PIN_SECONDS", DEFAULT_PIN_SECONDS)
+
+
+@contextmanager
+def routing(use_replica):
+    token = _state.set(RoutingState(use_replica))
+    try:
+        yield _state.get()
+    finally:
+        _state.reset(token)
+
+
+def read_from_replica():
+    """Lectures du bloc sur un réplica (rapports, exports hors requête)"""
+    return routing(True)
+
+
+def bind_read_database(queryset):
+    """
+    Fixe la base de lecture du queryset selon le routage courant, pour une
+    évaluation différée (réponse en flux) faite après la sortie de ``routing()``.
+    """
+    return queryset.using(queryset.db)
+
+
+def _mark_writes(execute, sql, params, many, context):
+    result = execute(sql, params, many, context)
+    state = _state.get()
+    if state is not None and not state.wrote:
+        if sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+            state.wrote = True
+    return result
+
+
+@receiver(connection_created)
+def watch_writes(sender, connection, **kwargs):
+    if _mark_writes not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_mark_writes)
+
+
+# Connexions déjà ouvertes au chargement du module
+for _connection in connections.all(initialized_only=True):
+    watch_writes(None, _connection)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        aliases = replicas()
+        if (
+            state is None
+            or not state.use_replica
+            or state.wrote
+            or not aliases
+            # Une lecture dans une transaction doit voir ses écritures
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        # Appelé aussi pour les lectures d'un get_or_create : l'écriture
+        # n'est constatée qu'à l'exécution (_mark_writes)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas et base principale contiennent les mêmes données
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Le schéma des réplicas vient de la réplication
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Choisit la base de lecture de chaque requête et pose le cookie
+    d'épinglage après une écriture réussie.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with routing(self.use_replica(request)) as state:
+            response = self.get_response(request)
+        return self.finish(request, response, state)
+
+    async def __acall__(self, request):
+        with routing(self.use_replica(request)) as state:
+            response = await self.get_response(request)
+        return self.finish(request, response, state)
+
+    def use_replica(self, request):
+        return request.method in SAFE_METHODS and PIN_COOKIE not in request.COOKIES
+
+    def finish(self, request, response, state):
+        wrote = state.wrote or request.method not in SAFE_METHODS
+        if wrote and response.status_code < 400 and replicas():
+            response.set_cookie(
+                PIN_COOKIE, "1", max_age=pin_seconds(), httponly=True, samesite="Lax"
+            )
+        return response
@@ -0,0 +1,145 @@
+"""
+Instrumentation des requêtes SQL par requête HTTP.
+
+Chaque connexion reçoit, à sa création, un ``execute_wrapper`` qui ajoute
+le nombre et la durée de ses requêtes aux statistiques de la requête HTTP
+courante. Ces statistiques vivent dans une ``ContextVar`` : elles suivent
+la requête jusque dans les threads de ``sync_to_async``, y compris pour les
+vues asynchrones qui lancent des requêtes en parallèle.
+
+``QueryCountMiddleware`` les expose dans l'en-tête ``Server-Timing`` et
+journalise les requêtes qui dépassent le budget configuré
+(``QUERY_COUNT_BUDGET`` et ``QUERY_TIME_BUDGET_MS`` dans les settings).
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERY_COUNT_BUDGET = 30
+DEFAULT_QUERY_TIME_BUDGET_MS = 200
+
+
+class QueryStats:
+    def __init__(self, parent=None):
+        self.count = 0
+        self.duration = 0.0
+        self.parent = parent
+        self._lock = threading.Lock()
+
+    def add(self, duration):
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+        # Un bloc imbriqué (ex. le middleware sous un test) compte aussi
+        # pour le bloc englobant
+        if self.parent is not None:
+            self.parent.add(duration)
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+
+_current_stats = ContextVar("query_stats", default=None)
+
+
+def _record(execute, sql, params, many, context):
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add(time.perf_counter() - start)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    if _record not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record)
+
+
+# Connexions déjà ouvertes au chargement du module
+for _connection in connections.all(initialized_only=True):
+    instrument_connection(None, _connection)
+
+
+@contextmanager
+def track_queries():
+    """
+    Compte les requêtes SQL exécutées dans le bloc (tous threads confondus).
+    """
+    stats = QueryStats(parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def query_budget():
+    return (
+        getattr(settings, "QUERY_COUNT_BUDGET", DEFAULT_QUERY_COUNT_BUDGET),
+        getattr(settings, "QUERY_TIME_BUDGET_MS", DEFAULT_QUERY_TIME_BUDGET_MS),
+    )
+
+
+class QueryCountMiddleware:
+    """
+    Ajoute ``Server-Timing: db;dur=…;desc="N queries", app;dur=…`` à chaque
+    réponse et journalise les endpoints hors budget.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with track_queries() as stats:
+            response = self.get_response(request)
+        return self.finish(request, response, stats, start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with track_queries() as stats:
+            response = await self.get_response(request)
+        return self.finish(request, response, stats, start)
+
+    def finish(self, request, response, stats, start):
+        # Pour une réponse en flux, seules les requêtes déjà exécutées comptent
+        total_ms = (time.perf_counter() - start) * 1000
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries", '
+            f"app;dur={total_ms:.1f}"
+        )
+        count_budget, time_budget_ms = query_budget()
+        if stats.count > count_budget or stats.duration_ms > time_budget_ms:
+            logger.warning(
+                "Budget SQL dépassé : %s %s -> %d requêtes, %.1f ms SQL (budget %d / %d ms)",
+                request.method,
+                request.path,
+                stats.count,
+                stats.duration_ms,
+                count_budget,
+                time_budget_ms,
+            )
+        return response
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -54,13 +55,15 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.RoleClaimJWTAuthentication",
     ),
     "DEFAULT_PAGINATION_CLASS": "users.pagination.CustomUsersPagination",
     "PAGE_SIZE": 5,  # ← nombre d’objets par page
 }
 
 MIDDLEWARE = [
+    "config.querycount.QueryCountMiddleware",  # En premier : mesure toute la requête
+    "config.dbrouter.ReplicaRoutingMiddleware",  # Avant tout accès à la base
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -70,6 +73,11 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
+# Budget SQL par requête HTTP : au-delà, l'endpoint est journalisé
+# (voir config.querycount)
+QUERY_COUNT_BUDGET = 30
+QUERY_TIME_BUDGET_MS = 200
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
 ]
@@ -123,10 +131,42 @@ DATABASES = {
         "PASSWORD": "",  # Remplace par ton mot de passe Railway
         "HOST": "localhost",
         "PORT": "3306",
+        # Connexions persistantes (WSGI seulement), vérifiées avant chaque
+        # réutilisation. Sous ASGI, chaque requête synchrone s'exécute dans un
+        # nouveau thread : sa connexion ne serait jamais réutilisée ni fermée,
+        # elle est donc fermée en fin de requête.
+        "CONN_MAX_AGE": 0 if os.environ.get("DJANGO_ASGI") == "1" else 300,
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 WSGI_APPLICATION = "config.wsgi.application"
 
+# Threads (donc connexions) du pool des vues asynchrones, par processus,
+# voir config.dbpool. Prévoir workers x (DATABASE_POOL_SIZE + 2) connexions
+# côté MySQL (max_connections).
+DATABASE_POOL_SIZE = 8
+# Durée de vie (s) des connexions des threads du pool, persistantes sous
+# WSGI comme sous ASGI : ces threads sont peu nombreux et durables
+DATABASE_POOL_CONN_MAX_AGE = 300
+DATABASE_POOL_WAIT_WARNING_MS = 100
+
+# Réplicas en lecture (alias de DATABASES), voir config.dbrouter. Exemple :
+#     DATABASES["replica"] = {
+#         **DATABASES["default"],
+#         "HOST": "replica.example",
+#         "TEST": {"MIRROR": "default"},
+#     }
+#     DATABASE_REPLICAS = ["replica"]
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ["config.dbrouter.PrimaryReplicaRouter"]
+# Durée (s) pendant laquelle un client qui vient d'écrire lit sur la base principale
+REPLICA_PIN_SECONDS = 5
+
+# Durée (s) de cache du lot de GET /api/articles/reorder-recommendations/
+REORDER_CACHE_SECONDS = 60
+# Durée (s) de cache des pages de GET /api/articles/supplier-matrix/
+SUPPLIER_MATRIX_CACHE_SECONDS = 60
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -0,0 +1,133 @@
+"""
+Outils de test : budget de requêtes SQL par route.
+
+Exemple, dans un ``tests.py`` ::
+
+    from config.testing import QueryBudgetTestMixin
+    from rest_framework.test import APITransactionTestCase
+
+    class RouteQueryBudgetTests(QueryBudgetTestMixin, APITransactionTestCase):
+        budgets = {"dashboard-stats": 3}
+        url_kwargs = {"articlesupplier-detail": {"pk": 1}}
+
+        def setUp(self):
+            ...  # créer les données de test
+            self.authenticate()
+
+``assertMaxQueries(budget)`` borne un bloc quelconque (POST, PATCH…).
+
+Le test ``test_route_query_budgets`` appelle en GET toutes les routes
+nommées de ``article.urls`` et ``users.urls`` et échoue si l'une d'elles
+dépasse son budget. Le comptage passe par ``config.querycount`` : les
+requêtes lancées en parallèle par les vues asynchrones sont incluses.
+Ces requêtes passent par d'autres connexions : utiliser un
+``TransactionTestCase`` pour qu'elles voient les données de test.
+"""
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.utils import add_role_claims
+
+from .querycount import query_budget, track_queries
+
+
+ROUTE_URLCONFS = ["article.urls", "users.urls"]
+
+
+def iter_named_routes(urlconf):
+    """
+    ``(nom, noms des paramètres)`` de chaque route nommée, sans doublon
+    (les variantes ``.json`` du routeur DRF sont ignorées).
+    """
+    seen = set()
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern.url_patterns)
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                params = [
+                    name
+                    for name in pattern.pattern.regex.groupindex
+                    if name != "format"
+                ]
+                if "format" in pattern.pattern.regex.groupindex or pattern.name in seen:
+                    continue
+                seen.add(pattern.name)
+                yield pattern.name, params
+
+    yield from walk(get_resolver(urlconf).url_patterns)
+
+
+class QueryBudgetTestMixin:
+    """
+    Vérifie le nombre de requêtes SQL de chaque route GET.
+
+    - ``budgets`` : budget par nom de route (sinon ``default_budget``) ;
+    - ``url_kwargs`` : paramètres d'URL par nom de route (sinon
+      ``default_url_kwarg`` pour chaque paramètre) ;
+    - ``skip_routes`` : routes à ne pas appeler.
+    """
+
+    budgets = {}
+    url_kwargs = {}
+    skip_routes = set()
+    default_url_kwarg = 1
+    urlconfs = ROUTE_URLCONFS
+
+    @property
+    def default_budget(self):
+        return query_budget()[0]
+
+    def authenticate(self, user=None):
+        """
+        Authentifie le client avec un vrai jeton JWT, pour que les vues
+        asynchrones (hors DRF) soient aussi couvertes.
+        """
+        if user is None:
+            user = get_user_model().objects.create_superuser(
+                "budget-admin", "budget@example.com", "budget-password"
+            )
+        token = add_role_claims(RefreshToken.for_user(user), user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return user
+
+    def iter_routes(self):
+        for urlconf in self.urlconfs:
+            for name, params in iter_named_routes(urlconf):
+                if name in self.skip_routes:
+                    continue
+                kwargs = self.url_kwargs.get(
+                    name, {param: self.default_url_kwarg for param in params}
+                )
+                yield name, reverse(name, kwargs=kwargs)
+
+    @contextmanager
+    def assertMaxQueries(self, budget, label="Bloc"):
+        """
+        Échoue si le bloc exécute plus de ``budget`` requêtes SQL (y compris
+        celles des threads lancés par les vues asynchrones).
+        """
+        with track_queries() as stats:
+            yield stats
+        self.assertLessEqual(
+            stats.count,
+            budget,
+            f"{label} : {stats.count} requêtes SQL pour un budget de {budget}",
+        )
+
+    def assertQueryBudget(self, path, budget, **extra):
+        with self.assertMaxQueries(budget, f"GET {path}"):
+            response = self.client.get(path, **extra)
+            # Consommer les réponses en flux pour compter leurs requêtes
+            if getattr(response, "streaming", False):
+                b"".join(response.streaming_content)
+        return response
+
+    def test_route_query_budgets(self):
+        for name, path in self.iter_routes():
+            with self.subTest(route=name, path=path):
+                self.assertQueryBudget(path, self.budgets.get(name, self.default_budget))
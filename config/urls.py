@@ -21,8 +21,12 @@ from django.conf.urls.static import static
 
 
 from django.conf import settings
+
+from config.dbpool import pool_stats_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/admin/db-pool/', pool_stats_view, name='db-pool-stats'),
     path('api/', include('users.urls')),  # adapte 'recette' à ton app réelle
     path('api/', include('article.urls')),  # adapte 'recette' à ton app réelle
 ]
@@ -0,0 +1,43 @@
+# authentication.py
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .utils import ROLES_CACHE_ATTR, ROLES_CLAIM, ROLES_VERSION_CLAIM
+
+
+class _UsersWithRoleVersion:
+    """
+    Stands in for the user model in JWTAuthentication.get_user, so that the
+    user and its RoleVersion row are loaded by the same query.
+    """
+
+    def __init__(self, user_model):
+        self.objects = user_model.objects.select_related("role_version")
+        self.DoesNotExist = user_model.DoesNotExist
+
+
+class RoleClaimJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the signed roles claim of the token.
+
+    When the claim is still current, the role set is attached to the user so
+    that permission checks need no group query.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user_model = _UsersWithRoleVersion(self.user_model)
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        roles = validated_token.get(ROLES_CLAIM)
+        if roles is None:
+            return user
+        try:
+            current = user.role_version.version.hex
+        except ObjectDoesNotExist:
+            # No version issued yet: the claim cannot be checked
+            return user
+        if validated_token.get(ROLES_VERSION_CLAIM) == current:
+            setattr(user, ROLES_CACHE_ATTR, frozenset(roles))
+        return user
@@ -0,0 +1,12 @@
+# filters.py
+import django_filters
+from django.contrib.auth.models import User
+
+
+class UserFilter(django_filters.FilterSet):
+    role = django_filters.CharFilter(field_name="groups__name")
+    search = django_filters.CharFilter(field_name="username", lookup_expr="istartswith")
+
+    class Meta:
+        model = User
+        fields = []
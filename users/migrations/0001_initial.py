@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-17 17:46
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoleVersion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='role_version', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('version', models.UUIDField(default=uuid.uuid4)),
+            ],
+            options={
+                'verbose_name': 'Version des rôles',
+                'verbose_name_plural': 'Versions des rôles',
+            },
+        ),
+    ]
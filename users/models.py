@@ -1,3 +1,28 @@
+import uuid
+
+from django.contrib.auth.models import User
 from django.db import models
 
-# Create your models here.
+
+class RoleVersion(models.Model):
+    """
+    Version des rôles d'un utilisateur, copiée dans ses tokens JWT.
+
+    Stockée en base (et non dans le cache local d'un processus) pour qu'un
+    changement de groupes invalide les claims de rôles sur tous les workers.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="role_version",
+    )
+    version = models.UUIDField(default=uuid.uuid4)
+
+    class Meta:
+        verbose_name = "Version des rôles"
+        verbose_name_plural = "Versions des rôles"
+
+    def __str__(self):
+        return f"{self.user_id} - {self.version}"
@@ -4,3 +4,7 @@ class CustomUsersPagination(PageNumberPagination):
     page_size = 5  # nombre d’objets retournés par défaut (5 recettes par page)
     page_size_query_param = 'page_size'  # permet d’ajuster dynamiquement avec ?page_size=10
     max_page_size = 100  # limite max pour éviter les abus
+
+
+class PickerPagination(CustomUsersPagination):
+    page_size = 20  # listes de choix : pages plus longues, objets plus légers
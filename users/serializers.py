@@ -37,11 +37,20 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ["id", "username", "email", "first_name", "last_name", "roles"]
 
     def get_roles(self, obj):
+        # Utilise le cache de prefetch_related("groups") s'il est présent
         groups = obj.groups.all()
 
         return groups[0].name if groups else ""
 
 
+class UserPickerSerializer(serializers.ModelSerializer):
+    """Projection légère pour les listes de choix (id et username)"""
+
+    class Meta:
+        model = User
+        fields = ["id", "username"]
+
+
 class CreateUserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
     roles = serializers.ListField(child=serializers.CharField(), required=True)
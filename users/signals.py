@@ -1,7 +1,9 @@
 # signals.py - Création automatique des groupes
-from django.db.models.signals import post_migrate
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, pre_delete
 from django.dispatch import receiver
-from django.contrib.auth.models import Group
+from django.contrib.auth.models import Group, User
+
+from .utils import bump_roles_version, clear_user_roles
 
 @receiver(post_migrate)
 def create_default_groups(sender, **kwargs):
@@ -12,3 +14,32 @@ def create_default_groups(sender, **kwargs):
         group, created = Group.objects.get_or_create(name=group_name)
         if created:
             print(f'Groupe "{group_name}" créé avec succès')
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_roles(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalider les rôles mémorisés et les claims JWT après un changement de groupes"""
+    if reverse and action == "pre_clear":
+        # group.user_set.clear() : pk_set est vide, les membres sont lus avant
+        instance._role_user_ids = list(instance.user_set.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        clear_user_roles(instance)
+        bump_roles_version([instance.pk])
+    elif action == "post_clear":
+        bump_roles_version(instance.__dict__.pop("_role_user_ids", []))
+    else:
+        bump_roles_version(pk_set or [])
+
+
+@receiver(pre_delete, sender=Group)
+def collect_group_members(sender, instance, **kwargs):
+    """La suppression d'un groupe n'émet pas m2m_changed : membres lus avant"""
+    instance._role_user_ids = list(instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Group)
+def invalidate_group_roles(sender, instance, **kwargs):
+    bump_roles_version(instance.__dict__.pop("_role_user_ids", []))
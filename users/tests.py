@@ -1,3 +1,45 @@
+from django.contrib.auth.models import Group, User
 from django.test import TestCase
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from .authentication import RoleClaimJWTAuthentication
+from .utils import ROLES_CACHE_ATTR, add_role_claims
+
+
+class RoleClaimInvalidationTests(TestCase):
+    def setUp(self):
+        self.group = Group.objects.get_or_create(name="gestionnaire")[0]
+        self.user = User.objects.create_user("alice", password="x")
+        self.user.groups.add(self.group)
+
+    def authenticate(self, token):
+        auth = RoleClaimJWTAuthentication()
+        return auth.get_user(auth.get_validated_token(str(token)))
+
+    def issue(self):
+        return add_role_claims(RefreshToken.for_user(self.user), self.user).access_token
+
+    def assertClaimTrusted(self, token, trusted):
+        user = self.authenticate(token)
+        self.assertEqual(ROLES_CACHE_ATTR in user.__dict__, trusted)
+
+    def test_current_claim_is_trusted_without_extra_query(self):
+        token = self.issue()
+        with self.assertNumQueries(1):
+            user = self.authenticate(token)
+        self.assertEqual(user.__dict__[ROLES_CACHE_ATTR], frozenset(["gestionnaire"]))
+
+    def test_user_groups_change_invalidates_claim(self):
+        token = self.issue()
+        self.user.groups.add(Group.objects.create(name="magasinier"))
+        self.assertClaimTrusted(token, False)
+
+    def test_group_clear_invalidates_members_claims(self):
+        token = self.issue()
+        self.group.user_set.clear()
+        self.assertClaimTrusted(token, False)
+
+    def test_group_delete_invalidates_members_claims(self):
+        token = self.issue()
+        self.group.delete()
+        self.assertClaimTrusted(token, False)
@@ -3,7 +3,7 @@ from django.urls import path
 from . import views
 
 
-from .views import CurrentUserView, UserListView,FournisseurListView 
+from .views import CurrentUserView, UserListView,FournisseurListView, FournisseurPickerView
 
 urlpatterns = [
     path("login/", views.login_view, name="login"),
@@ -17,4 +17,5 @@ urlpatterns = [
     path("me/", CurrentUserView.as_view(), name="current-user"),
     path("users/", UserListView.as_view(), name="user-list"),
     path("users-f/", FournisseurListView .as_view(), name="user-f"),
+    path("users-f/picker/", FournisseurPickerView.as_view(), name="user-f-picker"),
 ]
@@ -1,12 +1,24 @@
-
 # utils.py - Helper functions for role management
+import uuid
+
 from django.contrib.auth.models import Group, User
 
+from .models import RoleVersion
+
+# Attribute used to memoize the role set on a user instance
+ROLES_CACHE_ATTR = "_cached_roles"
+
+# JWT claims carrying the roles and the version they were issued with
+ROLES_CLAIM = "roles"
+ROLES_VERSION_CLAIM = "roles_version"
+
+
 def assign_user_to_group(user, group_name):
     """Assign user to a group (role)"""
     group, created = Group.objects.get_or_create(name=group_name)
     user.groups.add(group)
     user.save()
+    clear_user_roles(user)
 
 def remove_user_from_group(user, group_name):
     """Remove user from a group (role)"""
@@ -14,13 +26,57 @@ def remove_user_from_group(user, group_name):
         group = Group.objects.get(name=group_name)
         user.groups.remove(group)
         user.save()
+        clear_user_roles(user)
     except Group.DoesNotExist:
         pass
 
+def resolve_user_roles(user):
+    """
+    Return the user's role names as a frozenset.
+
+    The set is resolved with a single query the first time it is needed and
+    memoized on the user object, so every later check in the same request is
+    free. The JWT authentication class may pre-fill it from the token claim.
+    """
+    roles = getattr(user, ROLES_CACHE_ATTR, None)
+    if roles is None:
+        if user is None or not user.is_authenticated:
+            return frozenset()
+        roles = frozenset(user.groups.values_list("name", flat=True))
+        setattr(user, ROLES_CACHE_ATTR, roles)
+    return roles
+
+def clear_user_roles(user):
+    """Drop the memoized role set so the next check hits the database"""
+    user.__dict__.pop(ROLES_CACHE_ATTR, None)
+
 def get_user_roles(user):
     """Get all roles (groups) for a user"""
-    return [group.name for group in user.groups.all()]
+    return sorted(resolve_user_roles(user))
 
 def has_role(user, role_name):
     """Check if user has a specific role"""
-    return user.groups.filter(name=role_name).exists()
\ No newline at end of file
+    return role_name in resolve_user_roles(user)
+
+def roles_version(user):
+    """
+    Current version of a user's roles, used to reject stale token claims.
+
+    The version is stored on a row linked to the user (RoleVersion), so a
+    bump made by one worker is seen by every other worker. The row is
+    created the first time a token is issued.
+    """
+    try:
+        return user.role_version.version.hex
+    except RoleVersion.DoesNotExist:
+        return RoleVersion.objects.get_or_create(user=user)[0].version.hex
+
+def bump_roles_version(user_ids):
+    """Invalidate the roles claim of every token issued to these users"""
+    RoleVersion.objects.filter(user_id__in=list(user_ids)).update(version=uuid.uuid4())
+
+def add_role_claims(token, user):
+    """Embed the user's roles as signed claims in a simplejwt token"""
+    token[ROLES_CLAIM] = get_user_roles(user)
+    token[ROLES_VERSION_CLAIM] = roles_version(user)
+    return token
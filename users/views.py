@@ -1,5 +1,6 @@
 # users/views.py
-from rest_framework import status
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
@@ -9,9 +10,13 @@ from django.contrib.auth.models import User, Group
 from rest_framework.views import APIView
 
 
+from .filters import UserFilter
+from .pagination import CustomUsersPagination, PickerPagination
+from .utils import add_role_claims, clear_user_roles, has_role
 from .serializers import (
     LoginSerializer,
     UserSerializer,
+    UserPickerSerializer,
     CreateUserSerializer,
     AssignRoleSerializer,
     GetCurrentUserInfoSerializer,
@@ -20,7 +25,15 @@ from .serializers import (
 
 def is_admin(user):
     """Vérifier si l'utilisateur est admin"""
-    return user.is_superuser or user.groups.filter(name="admin").exists()
+    return user.is_superuser or has_role(user, "admin")
+
+
+def users_with_roles():
+    """
+    Utilisateurs triés par id, groupes préchargés : les rôles de toute une
+    page sont lus en une seule requête.
+    """
+    return User.objects.prefetch_related("groups").order_by("id")
 
 
 @api_view(["POST"])
@@ -36,7 +49,7 @@ def login_view(request):
         user = serializer.validated_data["user"]
 
         # Générer les tokens JWT
-        refresh = RefreshToken.for_user(user)
+        refresh = add_role_claims(RefreshToken.for_user(user), user)
         access_token = refresh.access_token
 
         # Données utilisateur avec rôles
@@ -108,6 +121,7 @@ def assign_roles_view(request):
         user = User.objects.get(id=user_id)
         groups = Group.objects.filter(name__in=roles)
         user.groups.set(groups)
+        clear_user_roles(user)
 
         user_serializer = UserSerializer(user)
 
@@ -128,17 +142,25 @@ def assign_roles_view(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def list_users_view(request):
-    """Lister tous les utilisateurs (admin seulement)"""
+    """Lister les utilisateurs, page par page (admin seulement)"""
     if not is_admin(request.user):
         return Response(
             {"error": "Permission refusée."}, status=status.HTTP_403_FORBIDDEN
         )
 
-    users = User.objects.all()
-    serializer = UserSerializer(users, many=True)
+    users = UserFilter(request.GET, queryset=users_with_roles()).qs
+    paginator = CustomUsersPagination()
+    page = paginator.paginate_queryset(users, request)
+    serializer = UserSerializer(page, many=True)
 
     return Response(
-        {"users": serializer.data, "total": users.count()}, status=status.HTTP_200_OK
+        {
+            "users": serializer.data,
+            "total": paginator.page.paginator.count,
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+        },
+        status=status.HTTP_200_OK,
     )
 
 
@@ -198,26 +220,51 @@ class CurrentUserView(APIView):
         return Response(serializer.data)
 
 
-class UserListView(APIView):
+class UserListView(generics.ListAPIView):
+    """
+    GET /api/users/ - Utilisateurs paginés (admin seulement)
+    Filtres : ?role=fournisseur, ?search=<début du username>
+    """
     permission_classes = [IsAuthenticated]
+    serializer_class = UserSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = UserFilter
 
-    def get(self, request):
-        user = request.user
+    def get_queryset(self):
+        return users_with_roles()
+
+    def list(self, request, *args, **kwargs):
         # Vérifie si l'utilisateur est dans le groupe "admin"
-        if user.groups.filter(name="admin").exists():
-            users = User.objects.all()
-            serializer = UserSerializer(users, many=True)
-            return Response(serializer.data)
-        return Response({"detail": "Accès refusé"}, status=403)
+        if not has_role(request.user, "admin"):
+            return Response({"detail": "Accès refusé"}, status=403)
+        return super().list(request, *args, **kwargs)
 
 
-class FournisseurListView(APIView):
+class FournisseurListView(generics.ListAPIView):
+    """
+    GET /api/users-f/ - Fournisseurs paginés
+    Filtre : ?search=<début du username>
+    """
     permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-            user = request.user
-        # Vérifie si l'utilisateur est dans le groupe "admin"
-
-            users = User.objects.filter(groups__name="fournisseur")
-            serializer = UserSerializer(users, many=True)
-            return Response(serializer.data)
+    serializer_class = UserSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = UserFilter
+
+    def get_queryset(self):
+        return users_with_roles().filter(groups__name="fournisseur")
+
+
+class FournisseurPickerView(FournisseurListView):
+    """
+    GET /api/users-f/picker/ - Fournisseurs réduits à id et username,
+    pour les listes de choix (aucune requête sur les groupes)
+    """
+    serializer_class = UserPickerSerializer
+    pagination_class = PickerPagination
+
+    def get_queryset(self):
+        return (
+            User.objects.filter(groups__name="fournisseur")
+            .only("id", "username")
+            .order_by("username", "id")
+        )